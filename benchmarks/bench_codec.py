@@ -0,0 +1,105 @@
+"""Measure the cost of marshaling the values of tasks.
+
+Compares `Task._deserialize` and `Task._serialize`, going through the generic methods
+of each field, against the functions generated by `Schema.codec`, on a typical task
+with a few UDAs, then building such a task from a schema and from a dict of UDAs.
+
+    python benchmarks/bench_codec.py [--number N]
+
+Requires taskw_ng to be installed.
+"""
+import argparse
+import timeit
+
+from taskw_ng.fields import ChoiceField, DateField, NumericField, StringField
+from taskw_ng.task import Task
+
+UDAS = {
+    "estimate": NumericField(label="Estimate"),
+    "remind": DateField(label="Remind"),
+    "size": ChoiceField(choices=["S", "M", "L"], label="Size"),
+    "note": StringField(label="Note"),
+}
+
+TASK = {
+    "id": 12,
+    "uuid": "d4b54c6d-b6a2-4173-8313-79086ef2af18",
+    "description": "Write the &open;quarterly&close; report",
+    "status": "pending",
+    "priority": "H",
+    "project": "work.reports",
+    "entry": "20230102T030405Z",
+    "modified": "20230105T101112Z",
+    "due": "20230201T000000Z",
+    "tags": ["office", "writing"],
+    "urgency": 9.8,
+    "estimate": "3",
+    "remind": "20230131T090000Z",
+    "size": "m",
+    "note": "see the previous one",
+}
+
+
+def report(name, seconds, number):
+    print("%-32s %10.2f us/task" % (name, seconds / number * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    options = parser.parse_args()
+
+    schema = Task.get_schema(UDAS)
+    codec = schema.codec
+    items = list(TASK.items())
+    deserialized = [(key, Task._deserialize(key, value, schema)) for key, value in items]
+
+    number = options.number
+    report(
+        "deserialize (Task._deserialize)",
+        timeit.timeit(
+            lambda: [Task._deserialize(key, value, schema) for key, value in items],
+            number=number,
+        ),
+        number,
+    )
+    report(
+        "deserialize (Schema.codec)",
+        timeit.timeit(
+            lambda: [codec.deserialize(key, value) for key, value in items], number=number
+        ),
+        number,
+    )
+    report(
+        "serialize (Task._serialize)",
+        timeit.timeit(
+            lambda: [Task._serialize(key, value, schema) for key, value in deserialized],
+            number=number,
+        ),
+        number,
+    )
+    report(
+        "serialize (Schema.codec)",
+        timeit.timeit(
+            lambda: [codec.serialize(key, value) for key, value in deserialized],
+            number=number,
+        ),
+        number,
+    )
+
+    # The way hooks build tasks, from a dict of UDAs rather than a schema.
+    udas = dict(UDAS)
+    report(
+        "Task(udas=schema)",
+        timeit.timeit(lambda: Task(TASK, udas=schema), number=number),
+        number,
+    )
+    report(
+        "Task(udas=dict)",
+        timeit.timeit(lambda: Task(TASK, udas=udas), number=number),
+        number,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measure the cost of converting dates and durations to and from taskwarrior's formats.
+
+Compares `dateutil` parsing and `astimezone`/`strftime` formatting, as done before
+`taskw_ng.dates` was added, against `parse_date` and `format_date`, on distinct dates
+and on dates repeated across tasks, then the step by step parsing of durations against
+`parse_iso8601_duration`.
+
+    python benchmarks/bench_dates.py [--number N]
+
+Requires taskw_ng to be installed.
+"""
+import argparse
+import datetime
+import re
+import time
+from unittest import mock
+
+import dateutil.parser
+import dateutil.tz
+import pytz
+
+import taskw_ng.dates
+from taskw_ng.dates import format_date, parse_date
+from taskw_ng.fields import duration
+from taskw_ng.utils import DATE_FORMAT
+
+
+def parse_date_dateutil(value):
+    value = dateutil.parser.parse(value)
+    if not value.tzinfo:
+        value = value.replace(tzinfo=pytz.utc)
+    return value
+
+
+def format_date_strftime(value):
+    if not value.tzinfo:
+        value = value.replace(tzinfo=dateutil.tz.tzlocal())
+    return value.astimezone(pytz.utc).strftime(DATE_FORMAT)
+
+
+def report(name, function, values):
+    taskw_ng.dates._parse_date.cache_clear()
+    started = time.perf_counter()
+    for value in values:
+        function(value)
+    seconds = time.perf_counter() - started
+    print("%-40s %8.2f s/million" % (name, seconds / len(values) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000)
+    options = parser.parse_args()
+
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    dates = [start + datetime.timedelta(seconds=4321 * i) for i in range(options.number)]
+    distinct = [value.strftime(DATE_FORMAT) for value in dates]
+    repeated = [distinct[i % 100] for i in range(options.number)]
+    naive = [value.replace(tzinfo=None) for value in dates]
+
+    report("parse distinct dates (dateutil)", parse_date_dateutil, distinct)
+    report("parse distinct dates (parse_date)", parse_date, distinct)
+    report("parse repeated dates (dateutil)", parse_date_dateutil, repeated)
+    report("parse repeated dates (parse_date)", parse_date, repeated)
+    report("format UTC dates (strftime)", format_date_strftime, dates)
+    report("format UTC dates (format_date)", format_date, dates)
+    report("format naive dates (strftime)", format_date_strftime, naive)
+    report("format naive dates (format_date)", format_date, naive)
+
+    durations = [
+        "P%dDT%dH%dM%dS" % (i % 30, i % 24, i % 60, i % 7) for i in range(options.number)
+    ]
+    with mock.patch.object(duration, "ISO8601_DURATION", re.compile("(?!)")):
+        report("parse durations (step by step)", duration.parse_iso8601_duration, durations)
+    report("parse durations (regular expression)", duration.parse_iso8601_duration, durations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure how long importing taskw_ng takes in a fresh interpreter.
+
+Reports the median time taken by ``python -c "import taskw_ng"`` compared to an empty
+interpreter, then the slowest modules imported along the way, as reported by
+``python -X importtime``.
+
+    python benchmarks/bench_import.py [--number N]
+
+Requires taskw_ng to be installed.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+
+def time_interpreter(code, number):
+    timings = []
+    for _ in range(number):
+        started = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", code])
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def slowest_imports(count):
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import taskw_ng"],
+        stderr=subprocess.PIPE,
+        check=True,
+    ).stderr.decode()
+
+    imports = []
+    for line in output.splitlines()[1:]:
+        _, own, cumulative, name = [part.strip() for part in line.replace(":", "|").split("|")]
+        imports.append((int(cumulative), name))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20)
+    options = parser.parse_args()
+
+    baseline = time_interpreter("pass", options.number)
+    total = time_interpreter("import taskw_ng", options.number)
+    print("import taskw_ng: %.1f ms" % ((total - baseline) * 1e3))
+
+    print("\nslowest imports (cumulative):")
+    for cumulative, name in slowest_imports(10):
+        print("%8.1f ms  %s" % (cumulative / 1e3, name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure the fixed cost of running a taskwarrior command.
+
+Compares building the command line from scratch, as done before the prefix was cached,
+against `TaskWarrior._get_command`, then the cost of spawning a trivial taskwarrior
+command with and without `fast_spawn`.
+
+    python benchmarks/bench_spawn.py [--number N]
+
+Requires taskw_ng to be installed, as well as the ``task`` command-line tool.
+"""
+import argparse
+import os
+import tempfile
+import timeit
+
+import taskw_ng.utils
+from taskw_ng.warrior import TaskWarrior
+
+ARGS = ["7a4d6c3a-7b8a-4b1e-9d3a-2f4f0a0b5c11", "modify", "project:foo", "+bar"]
+
+
+def build_command_uncached(tw):
+    command = ["task"] + tw.get_configuration_override_args() + ARGS
+    env = os.environ.copy()
+    env["TASKRC"] = tw.config_filename
+    return [taskw_ng.utils.clean_ctrl_chars(arg.encode("utf-8")) for arg in command], env
+
+
+def report(name, seconds, number):
+    print("%-32s %10.2f us/call" % (name, seconds / number * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_location:
+        taskrc = os.path.join(data_location, "taskrc")
+        with open(taskrc, "w") as f:
+            f.write("data.location=%s\n" % data_location)
+
+        tw = TaskWarrior(config_filename=taskrc)
+        fast_tw = TaskWarrior(config_filename=taskrc, fast_spawn=True)
+
+        number = options.number * 50
+        report(
+            "build command (uncached)",
+            timeit.timeit(lambda: build_command_uncached(tw), number=number),
+            number,
+        )
+        report(
+            "build command (cached prefix)",
+            timeit.timeit(lambda: tw._get_command(ARGS), number=number),
+            number,
+        )
+
+        number = options.number
+        report(
+            "task _version",
+            timeit.timeit(lambda: tw._execute("_version"), number=number),
+            number,
+        )
+        report(
+            "task _version (fast_spawn)",
+            timeit.timeit(lambda: fast_tw._execute("_version"), number=number),
+            number,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,18 @@ from taskw_ng.warrior import TaskWarrior
 
 __all__ = [
     "TaskWarrior",
+    "AsyncTaskWarrior",
     "clean_task",
     "encode_task",
     "decode_task",
     "encode_task_experimental",
 ]
+
+
+def __getattr__(name):
+    # asyncio is slow to import, and only needed by the asyncio client.
+    if name == "AsyncTaskWarrior":
+        from taskw_ng.aio import AsyncTaskWarrior
+
+        return AsyncTaskWarrior
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
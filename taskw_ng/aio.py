@@ -0,0 +1,240 @@
+"""Code to interact with taskwarrior from asyncio.
+
+See `AsyncTaskWarrior`.
+"""
+import asyncio
+import json
+
+import taskw_ng.utils
+from taskw_ng.warrior import TASKRC, Command, Status, TaskWarrior, TaskWarriorBase
+
+
+class AsyncTaskWarrior(TaskWarriorBase):
+    """Interacts with taskwarrior by invoking shell commands, without blocking the loop.
+
+    Mirrors the API of `TaskWarriorBase`, every method being a coroutine.  Arguments are
+    encoded and results marshaled exactly like `TaskWarrior` does.  At most
+    `max_concurrency` taskwarrior processes run at once; cancelling a call kills its
+    process.
+
+        w = AsyncTaskWarrior()
+        tasks = await w.load_tasks()
+    """
+
+    # Default number of taskwarrior processes allowed to run at once.
+    MAX_CONCURRENCY = 8
+
+    def __init__(
+        self,
+        config_filename=TASKRC,
+        config_overrides=None,
+        marshal=False,
+        max_concurrency=None,
+        fast_spawn=False,
+    ):
+        # Builds the command lines and marshals the tasks, but never runs anything.
+        self._client = TaskWarrior(
+            config_filename,
+            config_overrides=config_overrides,
+            marshal=marshal,
+            fast_spawn=fast_spawn,
+        )
+        self.config_filename = self._client.config_filename
+        self.config_overrides = self._client.config_overrides
+        self.config = self._client.config
+        self.max_concurrency = max_concurrency or self.MAX_CONCURRENCY
+        # Created on first use, so that it belongs to the running loop.
+        self._semaphore = None
+
+    def get_version(self):
+        return self._client.get_version()
+
+    async def _execute(self, *args, stdin=None, raw=False):
+        """Execute a given taskwarrior command with arguments
+
+        If given, `stdin` is encoded to utf-8 and fed to the command's standard input.
+
+        Returns a 2-tuple of stdout and stderr (respectively), left as bytes if `raw` is
+        set.
+        """
+        command, env = self._client._get_command(args)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *command,
+                    env=env,
+                    stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    **self._client._spawn_kwargs,
+                )
+            except FileNotFoundError:
+                raise FileNotFoundError("Unable to find the 'task' command-line tool.")
+
+            try:
+                stdout, stderr = await proc.communicate(
+                    stdin.encode("utf-8") if stdin is not None else None
+                )
+            except BaseException:
+                # Don't leave taskwarrior running behind our back, e.g., on cancellation.
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+
+        stdout, stderr = self._client._check_output(command, proc.returncode, stdout, stderr)
+        if raw:
+            return stdout, stderr
+        return self._client._decode(stdout), self._client._decode(stderr)
+
+    async def _get_json(self, *args):
+        return self._client._parse_json((await self._execute(*args, raw=True))[0])
+
+    async def _get_task_objects(self, *args, fields=None):
+        stdout, _ = await self._execute(*args, raw=True)
+        return self._client._parse_task_objects(stdout, fields)
+
+    async def sync(self, init=False):
+        if init is True:
+            await self._execute("sync", "init")
+        else:
+            await self._execute("sync")
+
+    async def load_tasks_and_filter(self, command, filter_=None, *, fields=None):
+        """Returns a dictionary of tasks for a list of command.
+
+        See `TaskWarrior.load_tasks_and_filter`.
+        """
+        query_args = self._client._group_filter(self._client._encode_filter(filter_))
+        statuses, status_filter = self._client._get_status_filter(command)
+        if fields is not None:
+            # Needed to sort the tasks by status.
+            fields = list(fields) + ["status"]
+        tasks = await self._get_task_objects(
+            status_filter, query_args, "export", fields=fields
+        )
+        return self._client._partition_by_status(statuses, [tasks])
+
+    async def load_tasks(self, command="all", *, fields=None) -> dict:
+        return await self.load_tasks_and_filter(command=command, filter_={}, fields=fields)
+
+    async def filter_tasks(self, filter_, *, fields=None):
+        """Return a filtered list of tasks from taskwarrior.
+
+        See `TaskWarrior.filter_tasks`.
+        """
+        query_args = taskw_ng.utils.encode_query(filter_, self.get_version())
+        return await self._get_task_objects(*(query_args + ["export"]), fields=fields)
+
+    async def filter_by(self, func):
+        return filter(func, await self.load_tasks())
+
+    async def get_task(self, **kw):
+        task_id, task = await self._load_task(**kw)
+
+        # The ID going back only makes sense if the task is pending.
+        if "status" in task and Status.is_pending(task["status"]):
+            return task_id, task
+        return None, task
+
+    async def _load_task(self, **kwargs):
+        if len(kwargs) > 1:
+            raise KeyError("Only one keyword argument may be specified")
+
+        search = self._client._get_search_args(**kwargs)
+        return self._client._first_task(await self._get_task_objects(*(search + ["export"])))
+
+    async def task_add(self, description, tags=None, **kw):
+        """Add a new task.
+
+        Takes any of the keywords allowed by taskwarrior like proj or prior.
+        """
+        task, annotations, args = self._client._prepare_task_add(description, tags, **kw)
+        stdout, stderr = await self._execute("add", *args)
+        task["uuid"] = self._client._parse_added_uuid(task, stdout, stderr)
+
+        for annotation in annotations:
+            await self._execute(task["uuid"], "annotate", "--", annotation)
+
+        id, added_task = await self.get_task(uuid=task["uuid"])
+        self._client._check_added_task(added_task, stdout, stderr)
+        return added_task
+
+    async def task_annotate(self, task, annotation):
+        """Annotates a task."""
+        await self._execute(task["uuid"], "annotate", "--", annotation)
+        return (await self.get_task(uuid=task["uuid"]))[1]
+
+    async def task_denotate(self, task, annotation):
+        """Removes an annotation from a task."""
+        await self._execute(task["uuid"], "denotate", "--", annotation)
+        return (await self.get_task(uuid=task["uuid"]))[1]
+
+    async def task_done(self, **kw):
+        if not kw:
+            raise KeyError("No key was passed.")
+
+        id, task = await self.get_task(**kw)
+
+        if not Status.is_pending(task["status"]):
+            raise ValueError("Task is not pending.")
+
+        await self._execute(task["uuid"], "done")
+        return (await self.get_task(uuid=task["uuid"]))[1]
+
+    async def task_update(self, task):
+        if "uuid" not in task:
+            raise KeyError("Task must have a UUID.")
+        task_uuid = str(task["uuid"])
+
+        # Fetch the task as exported, so that annotations keep their entry dates.
+        original_tasks = await self._get_json(task_uuid, "export")
+        if not original_tasks:
+            raise KeyError("No such task: %s" % task_uuid)
+
+        id, task_to_import, modification = self._client._plan_task_update(
+            task, original_tasks[0]
+        )
+
+        # Importing replaces the whole task, so it has to happen before `modify`.
+        if task_to_import is not None:
+            await self._execute("import", stdin=json.dumps(task_to_import, ensure_ascii=False))
+        if modification:
+            await self._execute(task_uuid, "modify", *modification)
+
+        return await self.get_task(uuid=task_uuid)
+
+    async def task_delete(self, **kw):
+        """Marks a task as deleted."""
+        id, task = await self.get_task(**kw)
+
+        if task["status"] == Status.DELETED:
+            raise ValueError("Task is already deleted.")
+
+        await self._execute(task["uuid"], "delete")
+        return (await self.get_task(uuid=task["uuid"]))[1]
+
+    async def task_start(self, **kw):
+        """Marks a task as started."""
+        id, task = await self.get_task(**kw)
+
+        await self._execute(task["uuid"], "start")
+        return (await self.get_task(uuid=task["uuid"]))[1]
+
+    async def task_stop(self, **kw):
+        """Marks a task as stopped."""
+        id, task = await self.get_task(**kw)
+
+        await self._execute(task["uuid"], "stop")
+        return (await self.get_task(uuid=task["uuid"]))[1]
+
+    async def task_info(self, **kw):
+        id, task = await self.get_task(**kw)
+        out, err = await self._execute(id, "info")
+        if err:
+            return err
+        return out
@@ -0,0 +1,40 @@
+"""Grouping of task operations into a single unit of work.
+
+See `TaskWarrior.batch`.
+"""
+from collections import OrderedDict
+
+
+class Batch(object):
+    """The operations recorded within a `TaskWarrior.batch` block.
+
+    Nothing in here has been written to taskwarrior yet.
+    """
+
+    def __init__(self):
+        # UUID -> task to create, in the format expected by `task import`
+        self.added = OrderedDict()
+        # UUID -> list of changes to apply, in the order they were made
+        self.updated = OrderedDict()
+        self.done = []
+        self.deleted = []
+
+    def __len__(self):
+        return (
+            len(self.added)
+            + sum(len(changes) for changes in self.updated.values())
+            + len(self.done)
+            + len(self.deleted)
+        )
+
+    def add(self, task):
+        self.added[task["uuid"]] = task
+
+    def update(self, task_uuid, changes):
+        self.updated.setdefault(str(task_uuid), []).append(changes)
+
+    def mark_done(self, task_uuid):
+        self.done.append(str(task_uuid))
+
+    def mark_deleted(self, task_uuid):
+        self.deleted.append(str(task_uuid))
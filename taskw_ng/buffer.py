@@ -0,0 +1,101 @@
+"""Write-behind buffering of task changes.
+
+See `TaskWarrior(write_buffer=True)`.
+"""
+import contextlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer(object):
+    """Collects pending changes to tasks so that they can be written all at once.
+
+    Changes are merged per task UUID, later values replacing earlier ones, and handed
+    over to `write` -- as a list of dicts holding the UUID and the changed fields of each
+    task -- as soon as one of the following happens:
+
+    * `max_size` tasks have pending changes,
+    * `max_delay` seconds have passed since the first pending change,
+    * `flush` is called explicitly.
+
+    If `write` fails, the changes are kept around so that the next flush retries them.
+    """
+
+    def __init__(self, write, max_size=100, max_delay=0.5):
+        self._write = write
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, task_uuid):
+        return str(task_uuid) in self._pending
+
+    def get(self, task_uuid):
+        """Return the pending changes of a task, or None if there are none."""
+        with self._lock:
+            changes = self._pending.get(str(task_uuid))
+            return dict(changes) if changes is not None else None
+
+    def add(self, task_uuid, changes):
+        """Record changes to a task, merging them with any pending ones."""
+        with self._lock:
+            self._pending.setdefault(str(task_uuid), {}).update(changes)
+
+            if self.max_size is not None and len(self._pending) >= self.max_size:
+                self.flush()
+            elif self._timer is None and self.max_delay is not None:
+                self._timer = threading.Timer(self.max_delay, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Make `flush` a no-op for the current thread while in this context."""
+        self._local.paused = getattr(self._local, "paused", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.paused -= 1
+
+    def flush(self):
+        """Write all pending changes."""
+        if getattr(self._local, "paused", 0):
+            return
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            try:
+                self._write(
+                    [dict(changes, uuid=task_uuid) for task_uuid, changes in pending.items()]
+                )
+            except Exception:
+                # Keep the changes around, unless they have been superseded meanwhile.
+                for task_uuid, changes in pending.items():
+                    changes.update(self._pending.get(task_uuid, {}))
+                    self._pending[task_uuid] = changes
+                raise
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception(
+                "Error encountered while writing %d buffered task(s); will retry on the"
+                " next flush",
+                len(self._pending),
+            )
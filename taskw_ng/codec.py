@@ -0,0 +1,190 @@
+"""Serializers and deserializers generated for the fields of a `Schema`.
+
+`Field` objects convert one value per method call, going through generic checks every
+time, e.g., `ChoiceField` comparing values to its list of choices.  A `Codec` instead
+generates, once per schema, one function per field, with these checks inlined and the
+parameters of the field turned into constants.  Fields leaving values unchanged get no
+function at all.  See `Schema.codec`.
+"""
+import datetime
+import numbers
+import uuid
+
+from taskw_ng.dates import format_date, parse_date
+from taskw_ng.fields import (
+    ChoiceField,
+    DateField,
+    DurationField,
+    Field,
+    NumericField,
+    StringField,
+    UUIDField,
+)
+from taskw_ng.fields.duration import parse_iso8601_duration
+from taskw_ng.utils import encode_replacements_experimental
+
+# Names the generated functions may use, besides the constants of each field.
+NAMESPACE = {
+    "Number": numbers.Number,
+    "UUID": uuid.UUID,
+    "date": datetime.date,
+    "format_date": format_date,
+    "parse_date": parse_date,
+    "parse_iso8601_duration": parse_iso8601_duration,
+}
+
+_ENCODE = "".join(
+    ".replace(%r, %r)" % (left, right)
+    for left, right in encode_replacements_experimental.items()
+)
+_DECODE = "".join(
+    ".replace(%r, %r)" % (right, left)
+    for left, right in encode_replacements_experimental.items()
+)
+
+# Source of the functions specialised for each type of field, by the method they
+# replace.  `{name}` is the name of the function, `{field}` the field itself, and the
+# other placeholders constants given by `_get_choice_constants`.
+DESERIALIZERS = {
+    DateField: """
+def {name}(value):
+    if not value:
+        return value
+    return parse_date(value)
+""",
+    DurationField: """
+def {name}(value):
+    if value is None:
+        return None
+    return parse_iso8601_duration(value)
+""",
+    NumericField: """
+def {name}(value):
+    if value is None or type(value) is int or type(value) is float:
+        return value
+    return {field}.deserialize(value)
+""",
+    StringField: """
+def {name}(value):
+    if not value:
+        return value
+    if type(value) is not str:
+        value = str(value)
+    return value%s
+"""
+    % _DECODE,
+    UUIDField: """
+def {name}(value):
+    if not value:
+        return value
+    return UUID(value)
+""",
+}
+SERIALIZERS = {
+    ChoiceField: """
+def {name}(value):
+    if value is None:
+        if {nullable}:
+            return value
+    elif {folded_value} in {choices}:
+        return value
+    raise ValueError("'%s' is not a valid choice; choices: %s" % (value, {field}._choices))
+""",
+    DateField: """
+def {name}(value):
+    if isinstance(value, date):
+        return format_date(value)
+    return value
+""",
+    DurationField: """
+def {name}(value):
+    if value is None:
+        return None
+    return "PT%dS" % int(value.total_seconds())
+""",
+    NumericField: """
+def {name}(value):
+    if type(value) is int or type(value) is float or not value or isinstance(value, Number):
+        return value
+    raise ValueError("Value must be numeric.")
+""",
+    StringField: """
+def {name}(value):
+    if not value:
+        return value
+    if type(value) is not str:
+        return {field}.serialize(value)
+    return value%s
+"""
+    % _ENCODE,
+    UUIDField: """
+def {name}(value):
+    if isinstance(value, UUID):
+        return str(value)
+    UUID(value)
+    return value
+""",
+}
+
+
+class Codec(object):
+    """The functions serializing and deserializing the values of each field of a schema.
+
+    `serializers` and `deserializers` map the name of each attribute to its function;
+    attributes missing from them are left as they are.  `source` is the generated code.
+    """
+
+    def __init__(self, fields):
+        namespace = dict(NAMESPACE)
+        source = []
+        names = {"serialize": {}, "deserialize": {}}
+        for index, (key, field) in enumerate(sorted(fields.items())):
+            constants = {"field": "field_%d" % index}
+            namespace["field_%d" % index] = field
+            if type(field) is ChoiceField:
+                constants.update(_get_choice_constants(field, "choices_%d" % index, namespace))
+
+            for method, templates in (
+                ("serialize", SERIALIZERS),
+                ("deserialize", DESERIALIZERS),
+            ):
+                name = "%s_%d" % (method, index)
+                template = templates.get(type(field))
+                if template is not None:
+                    source.append("\n# %s\n" % key.replace("\n", " "))
+                    source.append(template.lstrip("\n").format(name=name, **constants))
+                elif getattr(type(field), method) is not getattr(Field, method):
+                    # Not specialised; use the field's own method.
+                    namespace[name] = getattr(field, method)
+                else:
+                    continue
+                names[method][key] = name
+
+        self.source = "".join(source)
+        exec(compile(self.source, "<taskw_ng.codec>", "exec"), namespace)
+        self.serializers = {key: namespace[name] for key, name in names["serialize"].items()}
+        self.deserializers = {
+            key: namespace[name] for key, name in names["deserialize"].items()
+        }
+
+    def serialize(self, key, value):
+        """Marshal an outgoing value into Taskwarrior's JSON format."""
+        serialize = self.serializers.get(key)
+        return value if serialize is None else serialize(value)
+
+    def deserialize(self, key, value):
+        """Marshal an incoming value into a Python object."""
+        deserialize = self.deserializers.get(key)
+        return value if deserialize is None else deserialize(value)
+
+
+def _get_choice_constants(field, name, namespace):
+    """Put the choices of a `ChoiceField` in `namespace`, under `name`."""
+    if field._case_sensitive:
+        # Values may be unhashable; they are compared like `ChoiceField` does.
+        namespace[name] = tuple(field._choices)
+        folded_value = "value"
+    else:
+        namespace[name] = field._folded_choices
+        folded_value = "value.upper()"
+    return {"choices": name, "folded_value": folded_value, "nullable": None in field._choices}
@@ -0,0 +1,77 @@
+"""Conversion of dates to and from taskwarrior's format.
+
+Taskwarrior always exports dates as ``%Y%m%dT%H%M%SZ``, in UTC.  `parse_date` reads
+them without going through `dateutil`, which is only used for dates in any other
+format, and `format_date` writes them without `strftime`.
+"""
+
+import datetime
+import functools
+
+UTC = datetime.timezone.utc
+
+# Exports have many identical timestamps (e.g., the entry and modified dates of
+# tasks added together); datetimes being immutable, they can be shared.
+PARSE_CACHE_SIZE = 4096
+
+
+def parse_date(value):
+    """Return the aware datetime represented by ``value``.
+
+    Dates without timezone are taken to be in UTC.
+
+    >>> parse_date("20230102T030405Z")
+    datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    >>> parse_date("2023-01-02 03:04:05")
+    datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    """
+    return _parse_date(value)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_date(value):
+    if len(value) == 16 and value[8] == "T" and value[15] == "Z":
+        if value[:8].isdigit() and value[9:15].isdigit():
+            try:
+                return datetime.datetime(
+                    int(value[0:4]),
+                    int(value[4:6]),
+                    int(value[6:8]),
+                    int(value[9:11]),
+                    int(value[11:13]),
+                    int(value[13:15]),
+                    tzinfo=UTC,
+                )
+            except ValueError:
+                pass
+
+    from dateutil.parser import parse
+
+    value = parse(value)
+    if not value.tzinfo:
+        value = value.replace(tzinfo=UTC)
+    return value
+
+
+def format_date(value):
+    """Return a date or datetime in taskwarrior's format.
+
+    Datetimes are converted to UTC first; naive ones are taken to be in local time.
+
+    >>> format_date(datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=UTC))
+    '20230102T030405Z'
+    >>> format_date(datetime.date(2023, 1, 2))
+    '20230102T000000Z'
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not UTC:
+            value = value.astimezone(UTC)
+        return "%04d%02d%02dT%02d%02d%02dZ" % (
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+        )
+    return "%04d%02d%02dT000000Z" % (value.year, value.month, value.day)
@@ -1,4 +1,4 @@
-from dateutil.parser import parse
+from taskw_ng.dates import parse_date
 
 from .array import ArrayField
 from .base import DirtyableList
@@ -23,7 +23,7 @@ class Annotation(str):
     @property
     def entry(self):
         if self._entry:
-            return parse(self._entry)
+            return parse_date(self._entry)
         return self._entry
 
 
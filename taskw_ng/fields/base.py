@@ -18,6 +18,16 @@ class Field(object):
     def deserialize(self, value):
         return value
 
+    def deserialize_many(self, values):
+        """Deserialize a list of values at once, e.g., a column of many tasks.
+
+        Returns `values` itself if they are left as they are.
+        """
+        deserialize = self.deserialize
+        if getattr(deserialize, "__func__", None) is Field.deserialize:
+            return values
+        return [deserialize(value) for value in values]
+
     def serialize(self, value):
         return value
 
@@ -44,19 +54,54 @@ class Field(object):
 
 
 class Dirtyable(object):
-    """Superclass for all objects implementing trackability."""
+    """Superclass for all objects implementing trackability.
+
+    The original value is only copied when the object is first mutated, through one of
+    its own methods; values nested in it are not tracked.  Objects tracked by a `Task`
+    then add their key to its set of dirty keys, see `track`.
+    """
+
+    # Unset until the first mutation, also while pickling and copying.
+    _original_value = None
+    _trackers = ()
 
     def __init__(self, value=None):
-        self._original_value = copy.deepcopy(value)
         super(Dirtyable, self).__init__(value)
 
+    def __reduce__(self):
+        return type(self), (super(Dirtyable, self).copy(),), vars(self)
+
+    def track(self, dirty_keys, key):
+        """Add ``key`` to the set ``dirty_keys`` when this object is first mutated."""
+        self._trackers += ((dirty_keys, key),)
+
+    def _mutate(self):
+        if self._original_value is None:
+            self._original_value = copy.deepcopy(super(Dirtyable, self).copy())
+            for dirty_keys, key in self._trackers:
+                dirty_keys.add(key)
+
     def get_changes(self, keep=False):
-        if self._original_value == self:
+        original = self._original_value
+        if original is None:
             return {}
-        result = (self._original_value, self)
         if not keep:
-            self._original_value = copy.deepcopy(self)
-        return result
+            del self._original_value
+        if original == self:
+            return {}
+        return (original, self)
+
+
+def _mutating(base, name):
+    unbound = getattr(base, name)
+
+    def method(self, *args, **kwargs):
+        self._mutate()
+        return unbound(self, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = unbound.__doc__
+    return method
 
 
 class DirtyableList(Dirtyable, list):
@@ -65,3 +110,34 @@ class DirtyableList(Dirtyable, list):
 
 class DirtyableDict(Dirtyable, dict):
     pass
+
+
+for _name in (
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "__setitem__",
+    "append",
+    "clear",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "reverse",
+    "sort",
+):
+    setattr(DirtyableList, _name, _mutating(list, _name))
+
+for _name in (
+    "__delitem__",
+    "__ior__",
+    "__setitem__",
+    "clear",
+    "pop",
+    "popitem",
+    "setdefault",
+    "update",
+):
+    # `dict.__ior__` only exists from Python 3.9 on.
+    if hasattr(dict, _name):
+        setattr(DirtyableDict, _name, _mutating(dict, _name))
@@ -5,6 +5,7 @@ class ChoiceField(Field):
     def __init__(self, choices=None, nullable=False, case_sensitive=False, **kwargs):
         self._choices = choices if choices else []
         self._case_sensitive = case_sensitive
+        self._folded_choices = frozenset(v.upper() for v in self._choices if v)
         super(ChoiceField, self).__init__(**kwargs)
 
     def is_valid_choice(self, value):
@@ -14,9 +15,7 @@ class ChoiceField(Field):
             return True
         if self._case_sensitive and value in self._choices:
             return True
-        elif not self._case_sensitive and value.upper() in [
-            v.upper() for v in self._choices if v
-        ]:
+        elif not self._case_sensitive and value.upper() in self._folded_choices:
             return True
         elif self._case_sensitive and value in self._choices:
             return True
@@ -1,13 +1,22 @@
 import uuid
 
-import packaging
-import packaging.version
+from taskw_ng.utils import parse_version
 
 from .base import DirtyableList, Field
 
 
+class _ParsedVersion(object):
+    """A class attribute holding a `Version`, only parsed when first read."""
+
+    def __init__(self, value):
+        self._value = value
+
+    def __get__(self, instance, owner):
+        return parse_version(self._value)
+
+
 class CommaSeparatedUUIDField(Field):
-    version = packaging.version.parse("2.4")
+    version = _ParsedVersion("2.4")
 
     def deserialize(self, value):
         if not value:
@@ -28,7 +37,7 @@ class CommaSeparatedUUIDField(Field):
         if not hasattr(value, "__iter__"):
             raise ValueError("Value must be list or tuple, not %r." % value)
 
-        if self.version < packaging.version.parse("2.5"):
+        if self.version < parse_version("2.5"):
             return ",".join([str(v) for v in value])
         else:
             # We never hit this second code branch now.  taskwarrior changed
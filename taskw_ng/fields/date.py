@@ -1,10 +1,6 @@
 import datetime
 
-import dateutil
-import pytz
-from dateutil.parser import parse
-
-from taskw_ng.utils import DATE_FORMAT
+from taskw_ng.dates import format_date, parse_date
 
 from .base import Field
 
@@ -13,19 +9,14 @@ class DateField(Field):
     def deserialize(self, value):
         if not value:
             return value
-        value = parse(value)
-        if not value.tzinfo:
-            value = value.replace(tzinfo=pytz.utc)
-        return value
+        return parse_date(value)
+
+    def deserialize_many(self, values):
+        return [parse_date(value) if value else value for value in values]
 
     def serialize(self, value):
-        if isinstance(value, datetime.datetime):
-            if not value.tzinfo:
-                #  Dates not having timezone information should be
-                #  assumed to be in local time
-                value = value.replace(tzinfo=dateutil.tz.tzlocal())
-            #  All times should be converted to UTC before serializing
-            value = value.astimezone(pytz.utc).strftime(DATE_FORMAT)
-        elif isinstance(value, datetime.date):
-            value = value.strftime(DATE_FORMAT)
+        #  Dates not having timezone information are assumed to be in local
+        #  time, and all times are converted to UTC before serializing
+        if isinstance(value, datetime.date):
+            value = format_date(value)
         return value
@@ -1,8 +1,17 @@
+import re
 from datetime import timedelta
 from typing import Optional, Tuple
 
 from .base import Field
 
+_NUMBER = r"([0-9]+(?:\.[0-9]*)?)"
+
+# Durations whose parts are all in order, as exported by taskwarrior; the others go
+# through the step by step parsing of `parse_iso8601_duration`.
+ISO8601_DURATION = re.compile(
+    r"P(?:{0}Y)?(?:{0}M)?(?:{0}D)?(?:T(?:{0}H)?(?:{0}M)?(?:{0}S)?)?\Z".format(_NUMBER)
+)
+
 
 def extract_part(s: str, split: str) -> Tuple[float, str]:
     """
@@ -63,7 +72,29 @@ def parse_iso8601_duration(string: str) -> timedelta:
     >>> dt = parse_iso8601_duration("P2Y3M4D")
     >>> assert dt.days == 825
     >>> assert dt.seconds == 43200
+    >>> parse_iso8601_duration("PT1.5H") == timedelta(minutes=90)
+    True
     """
+    match = ISO8601_DURATION.match(string)
+    if match is not None:
+        if "." not in string:
+            years, months, days, hours, minutes, seconds = [
+                int(part) if part else 0 for part in match.groups()
+            ]
+            # Same rough conversion as below, a month being 30.5 days of 86400 seconds
+            return timedelta(
+                days + years * 365, months * 2635200 + hours * 3600 + minutes * 60 + seconds
+            )
+        years, months, days, hours, minutes, seconds = [
+            float(part) if part else 0.0 for part in match.groups()
+        ]
+        return timedelta(
+            days=days + months * 30.5 + years * 365,
+            hours=hours,
+            minutes=minutes,
+            seconds=seconds,
+        )
+
     orig_string = string
     if not string.startswith("P"):
         raise ValueError(
@@ -36,3 +36,11 @@ class NumericField(Field):
         # a non-numeric value stored in this field; this shouldn't
         # happen, but it's probably inappropriate to blow up.
         return value
+
+    def deserialize_many(self, values):
+        deserialize = self.deserialize
+        # Taskwarrior exports most numbers as JSON numbers already.
+        return [
+            value if type(value) is int or type(value) is float else deserialize(value)
+            for value in values
+        ]
@@ -18,6 +18,14 @@ class StringField(Field):
             value = value.replace(right, left)
         return value
 
+    def deserialize_many(self, values):
+        deserialize = self.deserialize
+        # Every replacement starts with "&"; strings without it are left as they are.
+        return [
+            deserialize(value) if value and (type(value) is not str or "&" in value) else value
+            for value in values
+        ]
+
     def serialize(self, value):
         # If value is None let it pass through
         if not value:
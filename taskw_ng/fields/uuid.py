@@ -9,6 +9,10 @@ class UUIDField(Field):
             return value
         return uuid.UUID(value)
 
+    def deserialize_many(self, values):
+        UUID = uuid.UUID
+        return [UUID(value) if value else value for value in values]
+
     def serialize(self, value):
         if isinstance(value, uuid.UUID):
             value = str(value)
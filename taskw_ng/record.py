@@ -0,0 +1,111 @@
+"""Compact, read-only tasks.
+
+See `TaskWarrior(marshal="compact")`.
+"""
+from collections.abc import Mapping
+
+from taskw_ng.fields.base import DirtyableList
+from taskw_ng.task import Task
+
+
+class TaskRecord(Mapping):
+    """A read-only task, taking a fraction of the memory of a `Task`.
+
+    Attributes known to every task are stored in slots, UDAs and unknown attributes in a
+    side dict.  Values are marshaled the way `Task` marshals them, lists becoming tuples,
+    but changes are neither allowed nor tracked.  Use `to_task` to get an editable copy.
+
+        record["due"]
+        record.due
+    """
+
+    __slots__ = tuple(Task.FIELDS) + ("_extra", "_schema")
+
+    def __init__(self, data, udas=None):
+        schema = Task.get_schema(udas)
+        deserializers = schema.codec.deserializers
+        extra = None
+        for key, value in data.items():
+            deserialize = deserializers.get(key)
+            if deserialize is not None:
+                value = _freeze(deserialize(value))
+            if key in Task.FIELDS:
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+
+        object.__setattr__(self, "_extra", extra)
+        object.__setattr__(self, "_schema", schema)
+
+    @classmethod
+    def _from_items(cls, items, schema):
+        """Create a record from already deserialized values."""
+        record = cls.__new__(cls)
+        extra = None
+        for key, value in items:
+            if key in Task.FIELDS:
+                object.__setattr__(record, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+
+        object.__setattr__(record, "_extra", extra)
+        object.__setattr__(record, "_schema", schema)
+        return record
+
+    def to_task(self):
+        """Return an editable `Task` holding the same values."""
+        task = Task({}, udas=self._schema)
+        # Values are already deserialized; skip `Task.__init__` doing it all over again.
+        dict.update(
+            task, ((key, task._track(key, _thaw(value))) for key, value in self.items())
+        )
+        return task
+
+    def __getitem__(self, key):
+        if key in Task.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __iter__(self):
+        for key in Task.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        extra = len(self._extra) if self._extra is not None else 0
+        return sum(1 for key in Task.FIELDS if hasattr(self, key)) + extra
+
+    def __setattr__(self, key, value):
+        raise AttributeError("%s is read-only; see to_task" % type(self).__name__)
+
+    def __delattr__(self, key):
+        raise AttributeError("%s is read-only; see to_task" % type(self).__name__)
+
+    def __reduce__(self):
+        return type(self)._from_items, (tuple(self.items()), self._schema)
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, dict(self.items()))
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, tuple):
+        return DirtyableList(list(value))
+    return value
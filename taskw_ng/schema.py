@@ -0,0 +1,40 @@
+"""The fields making up tasks.
+
+See `Schema`.
+"""
+from taskw_ng.codec import Codec
+
+
+class Schema(dict):
+    """An immutable mapping of attribute names to the fields marshaling them.
+
+    Merges `Task.FIELDS` with the fields of some UDAs once and for all, so that every
+    task having these UDAs shares it instead of merging its own copy.  See
+    `Task.get_schema` and `TaskRc.get_schema`.
+    """
+
+    _codec = None
+
+    def __init__(self, fields, udas=None):
+        super(Schema, self).__init__(fields)
+        if udas:
+            dict.update(self, udas)
+
+    @property
+    def codec(self):
+        """The `Codec` generated for these fields, the first time it is needed."""
+        if self._codec is None:
+            self._codec = Codec(self)
+        return self._codec
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("%s objects are immutable" % type(self).__name__)
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, dict.__repr__(self))
@@ -0,0 +1,568 @@
+"""Columnar tables of tasks, for analytics over many tasks at once.
+
+See `TaskTable`.
+"""
+import array
+import collections
+import datetime
+import itertools
+import math
+import operator
+
+from taskw_ng.dates import parse_date
+from taskw_ng.fields import ChoiceField, DateField, NumericField, StringField, UUIDField
+from taskw_ng.task import Task
+
+# Kinds of columns, and how their values are stored.
+DATE = "date"
+NUMBER = "number"
+STRING = "string"
+TAGS = "tags"
+
+TYPECODES = {DATE: "q", NUMBER: "d", STRING: "i", TAGS: "Q"}
+DTYPES = {DATE: "int64", NUMBER: "float64", STRING: "int32", TAGS: "uint64"}
+
+# Stored in date columns for tasks not having the date.
+MISSING_DATE = -(2**63)
+# Stored in string columns for tasks not having the string.
+MISSING_CODE = -1
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_WORD_MASK = 2**64 - 1
+_NUMBER_TYPES = (int, float)
+
+_COMPARISONS = {
+    "": operator.eq,
+    "is": operator.eq,
+    "equals": operator.eq,
+    "isnt": operator.ne,
+    "not": operator.ne,
+    "before": operator.lt,
+    "below": operator.lt,
+    "under": operator.lt,
+    "by": operator.le,
+    "after": operator.gt,
+    "above": operator.gt,
+    "over": operator.gt,
+}
+_STRING_MATCHES = {
+    "": operator.eq,
+    "is": operator.eq,
+    "equals": operator.eq,
+    "startswith": str.startswith,
+    "left": str.startswith,
+    "endswith": str.endswith,
+    "right": str.endswith,
+    "contains": operator.contains,
+    "has": operator.contains,
+}
+_STRING_MISMATCHES = {
+    "isnt": operator.eq,
+    "not": operator.eq,
+    "hasnt": operator.contains,
+}
+
+
+def get_column_kind(name, field):
+    """Return how the attribute `name`, marshaled by `field`, is stored in a `TaskTable`
+
+    Returns None for attributes that aren't stored, like annotations.
+    """
+    if name == "tags":
+        return TAGS
+    if isinstance(field, DateField):
+        return DATE
+    if isinstance(field, NumericField):
+        return NUMBER
+    if isinstance(field, (StringField, ChoiceField, UUIDField)):
+        return STRING
+    return None
+
+
+class TaskTable(object):
+    """Tasks stored column by column, to filter, sort and group many of them at once.
+
+    Dates are stored as int64 seconds since the epoch (`MISSING_DATE` if unset), numbers
+    as float64 (NaN if unset), strings as int32 codes into a list of distinct values
+    (`MISSING_CODE` if unset), and tags as bitsets, one array of 64-bit words per 64
+    distinct tags.  Other attributes, like annotations, are left out.
+
+    Columns are NumPy arrays, and operations on them are vectorised, when NumPy is
+    installed.  Otherwise, they are `array.array` objects, processed by plain loops.
+
+        table = w.load_table()
+        overdue = table.filter({"status": "pending", "due.before": datetime.now()})
+        overdue.count_by("project")
+    """
+
+    def __init__(self, length, kinds, columns, categories, tags, numpy=None):
+        self._length = length
+        self._kinds = kinds
+        self._columns = columns
+        self._categories = categories
+        self._tags = tags
+        self._numpy = numpy
+
+    @classmethod
+    def from_export(cls, tasks, udas=None, fields=None, use_numpy=True):
+        """Build a table from tasks as exported by taskwarrior.
+
+        :param udas: The UDA fields, as returned by `TaskRc.get_udas`, or a `Schema`.
+        :param fields: The only attributes to store, if given.
+        :param use_numpy: Whether to use NumPy, if installed.
+        """
+        numpy = _import_numpy() if use_numpy else None
+        if not isinstance(tasks, (list, tuple)):
+            tasks = list(tasks)
+
+        all_fields = Task.get_schema(udas)
+        kinds = {}
+        for name, field in all_fields.items():
+            kind = get_column_kind(name, field)
+            if kind is not None and (fields is None or name in fields):
+                kinds[name] = kind
+
+        columns = {}
+        categories = {}
+        tags = {}
+        for name, kind in kinds.items():
+            values = [task.get(name) for task in tasks]
+            if kind == STRING:
+                codes = {}
+                values = [
+                    MISSING_CODE if not value else codes.setdefault(value, len(codes))
+                    for value in values
+                ]
+                categories[name] = [str(value) for value in codes]
+                if isinstance(all_fields[name], StringField):
+                    # Undo taskwarrior's escaping, once per distinct value.
+                    categories[name] = [
+                        all_fields[name].deserialize(value) for value in categories[name]
+                    ]
+            elif kind == DATE:
+                values = _parse_dates(values)
+            elif kind == NUMBER:
+                values = [
+                    value if type(value) in _NUMBER_TYPES else _parse_number(value)
+                    for value in values
+                ]
+            else:
+                masks = [_get_tags_mask(value, tags) for value in values]
+                words = max(1, -(-len(tags) // 64))
+                columns[name] = [
+                    _make_column(
+                        numpy, kind, [(mask >> 64 * i) & _WORD_MASK for mask in masks]
+                    )
+                    for i in range(words)
+                ]
+                continue
+            columns[name] = _make_column(numpy, kind, values)
+
+        return cls(len(tasks), kinds, columns, categories, list(tags), numpy)
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return "<%s: %d tasks, %d columns>" % (
+            type(self).__name__,
+            self._length,
+            len(self._columns),
+        )
+
+    @property
+    def columns(self):
+        """Names of the attributes stored."""
+        return list(self._kinds)
+
+    @property
+    def tags(self):
+        """Distinct tags, in the order of their bits in the tags column."""
+        return list(self._tags)
+
+    def column(self, name):
+        """Return the raw column of an attribute - see `TaskTable`."""
+        return self._get_column(name)
+
+    def categories(self, name):
+        """Return the distinct values of a string attribute, as indexed by its codes."""
+        if self._get_kind(name) != STRING:
+            raise ValueError("%s is not a string column" % name)
+        return list(self._categories[name])
+
+    def values(self, name):
+        """Return the values of an attribute as a list, None standing for unset values.
+
+        Dates are returned as timezone-aware datetimes, and tags as lists ordered like
+        `tags`.
+        """
+        kind = self._get_kind(name)
+        column = self._get_column(name)
+        if kind == STRING:
+            lookup = self._categories[name] + [None]
+            return [lookup[code] for code in column.tolist()]
+        if kind == DATE:
+            return [
+                None if value == MISSING_DATE else _EPOCH + datetime.timedelta(seconds=value)
+                for value in column.tolist()
+            ]
+        if kind == NUMBER:
+            return [None if math.isnan(value) else value for value in column.tolist()]
+
+        words = [word.tolist() for word in column]
+        masks = [sum(word << 64 * i for i, word in enumerate(row)) for row in zip(*words)]
+        return [[tag for i, tag in enumerate(self._tags) if mask >> i & 1] for mask in masks]
+
+    def filter(self, filter_):
+        """Return the tasks matching every item of a filter, as a new table.
+
+        Takes a dict mapping attributes, optionally followed by a taskwarrior modifier as
+        in ``due.before``, to values.  Supported modifiers are:
+
+        * ``is``, ``isnt``, ``any`` and ``none`` for every attribute
+        * ``before``, ``after`` and ``by`` (with aliases) for dates and numbers
+        * ``startswith``, ``endswith``, ``contains`` and ``hasnt`` (with aliases) for
+          strings
+        * ``has`` and ``hasnt`` for tags
+
+        Contrary to taskwarrior, strings without a modifier are compared exactly.  Dates
+        are given as datetimes, dates, seconds since the epoch or in taskwarrior's format.
+        """
+        mask = None
+        for key, value in filter_.items():
+            name, _, modifier = key.partition(".")
+            matches = self._match(name, modifier, value)
+            mask = matches if mask is None else self._and(mask, matches)
+
+        if mask is None:
+            return self
+        return self._select(mask)
+
+    def sort_by(self, name, reverse=False):
+        """Return the tasks sorted by an attribute, as a new table.
+
+        Tasks not having the attribute come last, even if `reverse` is set.
+        """
+        kind = self._get_kind(name)
+        column = self._get_column(name)
+        numpy = self._numpy
+
+        if kind == STRING:
+            categories = self._categories[name]
+            ranks = [0] * len(categories)
+            for rank, code in enumerate(
+                sorted(range(len(categories)), key=categories.__getitem__, reverse=reverse)
+            ):
+                ranks[code] = rank
+            key = self._lookup(ranks + [len(categories)], column)
+        elif kind == DATE:
+            sign = -1 if reverse else 1
+            if numpy is not None:
+                key = numpy.where(
+                    column == MISSING_DATE, numpy.inf, sign * column.astype(float)
+                )
+            else:
+                key = [math.inf if value == MISSING_DATE else sign * value for value in column]
+        elif kind == NUMBER:
+            sign = -1 if reverse else 1
+            if numpy is not None:
+                key = numpy.where(numpy.isnan(column), numpy.inf, sign * column)
+            else:
+                key = [math.inf if math.isnan(value) else sign * value for value in column]
+        else:
+            raise ValueError("Cannot sort by %s" % name)
+
+        if numpy is not None:
+            return self._take(numpy.argsort(key, kind="stable"))
+        return self._take(sorted(range(self._length), key=key.__getitem__))
+
+    def count_by(self, name):
+        """Return how many tasks have each value of an attribute, as a dict.
+
+        Tasks not having the attribute are counted under None.  With tags, tasks are
+        counted once per tag they have.
+        """
+        kind = self._get_kind(name)
+        column = self._get_column(name)
+        counts = collections.Counter()
+
+        if kind == STRING:
+            lookup = self._categories[name] + [None]
+            if self._numpy is not None:
+                bins = self._numpy.bincount(column + 1, minlength=len(lookup))
+                pairs = zip(lookup[-1:] + lookup[:-1], bins.tolist())
+            else:
+                pairs = (
+                    (lookup[code], count)
+                    for code, count in collections.Counter(column).items()
+                )
+            for value, count in pairs:
+                if count:
+                    counts[value] += count
+        elif kind == TAGS:
+            for tag in self._tags:
+                count = self._count(self._has_tag(column, tag))
+                if count:
+                    counts[tag] = count
+            untagged = self._count(self._has_no_tags(column))
+            if untagged:
+                counts[None] = untagged
+        else:
+            counts.update(self.values(name))
+
+        return dict(counts)
+
+    def group_by(self, name):
+        """Return the tasks having each value of an attribute, as a dict of tables.
+
+        Tasks not having the attribute are grouped under None.  With tags, tasks are
+        grouped once per tag they have.
+        """
+        kind = self._get_kind(name)
+        column = self._get_column(name)
+
+        if kind == TAGS:
+            groups = {tag: self._select(self._has_tag(column, tag)) for tag in self._tags}
+            groups[None] = self._select(self._has_no_tags(column))
+            return {tag: table for tag, table in groups.items() if len(table)}
+
+        if kind == STRING and self._numpy is not None:
+            numpy = self._numpy
+            lookup = self._categories[name] + [None]
+            order = numpy.argsort(column, kind="stable")
+            bounds = numpy.flatnonzero(numpy.diff(column[order])) + 1
+            return {
+                lookup[column[indices[0]]]: self._take(indices)
+                for indices in numpy.split(order, bounds)
+                if len(indices)
+            }
+
+        indices = {}
+        for index, value in enumerate(self.values(name) if kind != STRING else column):
+            indices.setdefault(value, []).append(index)
+        if kind == STRING:
+            lookup = self._categories[name] + [None]
+            return {lookup[code]: self._take(group) for code, group in indices.items()}
+        return {value: self._take(group) for value, group in indices.items()}
+
+    def _get_kind(self, name):
+        try:
+            return self._kinds[name]
+        except KeyError:
+            raise KeyError("No such column: %s" % name)
+
+    def _get_column(self, name):
+        self._get_kind(name)
+        return self._columns[name]
+
+    def _match(self, name, modifier, value):
+        """Return the mask of the tasks matching a single item of a filter."""
+        kind = self._get_kind(name)
+        column = self._get_column(name)
+
+        if kind == TAGS:
+            if modifier in ("any", "none"):
+                present = self._not(self._has_no_tags(column))
+                return present if modifier == "any" else self._not(present)
+            if modifier not in ("", "has", "hasnt"):
+                raise ValueError("Unsupported modifier for %s: %s" % (name, modifier))
+            tags = [value] if isinstance(value, str) else list(value)
+            mask = None
+            for tag in tags:
+                matches = self._has_tag(column, tag)
+                mask = matches if mask is None else self._and(mask, matches)
+            if mask is None:
+                mask = self._full(True)
+            return self._not(mask) if modifier == "hasnt" else mask
+
+        if kind == STRING:
+            categories = self._categories[name]
+            if modifier in ("any", "none"):
+                lookup = [modifier == "any"] * len(categories) + [modifier == "none"]
+            elif modifier in _STRING_MATCHES:
+                match = _STRING_MATCHES[modifier]
+                lookup = [match(category, str(value)) for category in categories] + [False]
+            elif modifier in _STRING_MISMATCHES:
+                match = _STRING_MISMATCHES[modifier]
+                lookup = [not match(category, str(value)) for category in categories] + [True]
+            else:
+                raise ValueError("Unsupported modifier for %s: %s" % (name, modifier))
+            return self._lookup(lookup, column)
+
+        if kind == DATE:
+            present = self._compare(column, operator.ne, MISSING_DATE)
+            value = _to_epoch(value) if modifier not in ("any", "none") else None
+        else:
+            present = self._not(self._is_nan(column))
+            value = float(value) if modifier not in ("any", "none") else None
+
+        if modifier == "any":
+            return present
+        if modifier == "none":
+            return self._not(present)
+        if modifier not in _COMPARISONS:
+            raise ValueError("Unsupported modifier for %s: %s" % (name, modifier))
+
+        matches = self._compare(column, _COMPARISONS[modifier], value)
+        if _COMPARISONS[modifier] is operator.ne:
+            # Like taskwarrior, tasks not having the attribute aren't equal to anything.
+            return self._or(matches, self._not(present))
+        return self._and(matches, present)
+
+    def _has_tag(self, column, tag):
+        try:
+            bit = self._tags.index(tag)
+        except ValueError:
+            return self._full(False)
+        word = column[bit // 64]
+        bit = 1 << bit % 64
+        if self._numpy is not None:
+            return (word & self._numpy.uint64(bit)) != 0
+        return [value & bit != 0 for value in word]
+
+    def _has_no_tags(self, column):
+        if self._numpy is not None:
+            return ~self._numpy.any(self._numpy.stack(column), axis=0)
+        return [not any(values) for values in zip(*column)]
+
+    def _compare(self, column, compare, value):
+        if self._numpy is not None:
+            return compare(column, value)
+        return [compare(item, value) for item in column]
+
+    def _is_nan(self, column):
+        if self._numpy is not None:
+            return self._numpy.isnan(column)
+        return [math.isnan(item) for item in column]
+
+    def _full(self, value):
+        if self._numpy is not None:
+            return self._numpy.full(self._length, value)
+        return [value] * self._length
+
+    def _lookup(self, lookup, codes):
+        if self._numpy is not None:
+            return self._numpy.asarray(lookup)[codes]
+        return [lookup[code] for code in codes]
+
+    def _and(self, left, right):
+        if self._numpy is not None:
+            return left & right
+        return [a and b for a, b in zip(left, right)]
+
+    def _or(self, left, right):
+        if self._numpy is not None:
+            return left | right
+        return [a or b for a, b in zip(left, right)]
+
+    def _not(self, mask):
+        if self._numpy is not None:
+            return ~mask
+        return [not value for value in mask]
+
+    def _count(self, mask):
+        if self._numpy is not None:
+            return int(self._numpy.count_nonzero(mask))
+        return sum(mask)
+
+    def _select(self, mask):
+        """Return the tasks of a boolean mask, as a new table."""
+        if self._numpy is not None:
+            return self._derive(lambda column: column[mask], self._count(mask))
+        return self._derive(
+            lambda column: array.array(column.typecode, itertools.compress(column, mask)),
+            sum(mask),
+        )
+
+    def _take(self, indices):
+        """Return the tasks at the given indices, as a new table."""
+        if self._numpy is not None:
+            return self._derive(lambda column: column[indices], len(indices))
+        return self._derive(
+            lambda column: array.array(column.typecode, (column[i] for i in indices)),
+            len(indices),
+        )
+
+    def _derive(self, transform, length):
+        columns = {}
+        for name, column in self._columns.items():
+            if self._kinds[name] == TAGS:
+                columns[name] = [transform(word) for word in column]
+            else:
+                columns[name] = transform(column)
+        return type(self)(
+            length, self._kinds, columns, self._categories, self._tags, self._numpy
+        )
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _make_column(numpy, kind, values):
+    if numpy is not None:
+        return numpy.array(values, dtype=DTYPES[kind])
+    return array.array(TYPECODES[kind], values)
+
+
+def _parse_dates(values):
+    """Return the seconds since the epoch of dates as exported by taskwarrior.
+
+    Many tasks share the same days; each one is only converted once.
+    """
+    days = {}
+    result = []
+    for value in values:
+        if not value:
+            result.append(MISSING_DATE)
+            continue
+        if len(value) == 16 and value[8] == "T" and value[15] == "Z" and value[9:15].isdigit():
+            day = days.get(value[:8])
+            if day is None:
+                day = days[value[:8]] = _parse_day(value)
+            if day is not False:
+                time = int(value[9:15])
+                result.append(day + time // 10000 * 3600 + time // 100 % 100 * 60 + time % 100)
+                continue
+        result.append(int(parse_date(value).timestamp()))
+    return result
+
+
+def _parse_day(value):
+    """Return the seconds since the epoch of the day of a date, or False if invalid."""
+    try:
+        day = datetime.date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    except ValueError:
+        return False
+    return (day.toordinal() - _EPOCH_ORDINAL) * 86400
+
+
+def _parse_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _get_tags_mask(tags, bits):
+    mask = 0
+    for tag in tags or ():
+        mask |= 1 << bits.setdefault(tag, len(bits))
+    return mask
+
+
+def _to_epoch(value):
+    """Return the seconds since the epoch of a date given to `TaskTable.filter`."""
+    if isinstance(value, datetime.datetime):
+        # Like `DateField`, naive datetimes are taken to be in local time.
+        return int(value.timestamp())
+    if isinstance(value, datetime.date):
+        return (value.toordinal() - _EPOCH_ORDINAL) * 86400
+    if isinstance(value, str):
+        return _parse_dates([value])[0]
+    return int(value)
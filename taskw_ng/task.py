@@ -15,10 +15,14 @@ from taskw_ng.fields import (
     UUIDField,
 )
 from taskw_ng.fields.base import Dirtyable, DirtyableDict, DirtyableList
+from taskw_ng.schema import Schema
 
 # Sentinel value for not specifying a default
 UNSPECIFIED = object()
 
+# Number of schemas kept by `Task.get_schema` for dicts of UDAs.
+SCHEMA_CACHE_SIZE = 64
+
 
 logger = logging.getLogger(__name__)
 
@@ -71,30 +75,102 @@ class Task(dict):
     }
 
     def __init__(self, data, udas=None):
-        udas = udas or {}
-        self._fields = self.FIELDS.copy()
-        self._fields.update(udas)
-        self._changes = []
+        self._fields = self.get_schema(udas)
+        self._changes = {}
+        self._dirty = set()
 
+        deserializers = self._fields.codec.deserializers
         processed = {}
         for k, v in data.items():
-            processed[k] = self._deserialize(k, v, self._fields)
+            deserialize = deserializers.get(k)
+            processed[k] = self._track(k, v if deserialize is None else deserialize(v))
 
         super(Task, self).__init__(processed)
 
     @classmethod
     def from_stub(cls, data, udas=None):
-        """Create a Task from an already deserialized dict."""
-
-        udas = udas or {}
-        fields = cls.FIELDS.copy()
-        fields.update(udas)
+        """Create a Task from an already deserialized dict.
 
-        processed = {}
+        Every value is serialized once, to check it, raising a `ValueError` if it is
+        invalid.  Values serializing to themselves, e.g., a UUID or date given as a
+        string, are still in taskwarrior's format and get deserialized; others are kept
+        as they are rather than going through a serialize/deserialize round trip, lists
+        and dicts becoming trackable as when setting them.
+        """
+        task = cls({}, udas)
+        codec = task._fields.codec
         for k, v in data.items():
-            processed[k] = cls._serialize(k, v, fields)
+            if codec.serialize(k, v) == v:
+                v = codec.deserialize(k, v)
+            dict.__setitem__(task, k, task._track(k, _make_dirtyable(v)))
+        return task
 
-        return cls(processed, udas)
+    @classmethod
+    def bulk_from_export(cls, tasks, udas=None):
+        """Create Tasks from many tasks as exported by taskwarrior.
+
+        Gives the same tasks as calling `Task` on each of them, but values are converted
+        column by column: the field of each attribute deserializes the values of all
+        tasks having it in a single `Field.deserialize_many` call.
+        """
+        fields = cls.get_schema(udas)
+        rows = [dict(data) for data in tasks]
+
+        tracked = []
+        for key in set().union(*rows):
+            field = fields.get(key)
+            if field is None:
+                continue
+            having = [row for row in rows if key in row]
+            values = [row[key] for row in having]
+            converted = field.deserialize_many(values)
+            if converted is values:
+                continue
+            for row, value in zip(having, converted):
+                row[key] = value
+            if any(isinstance(value, Dirtyable) for value in converted):
+                tracked.append(key)
+
+        results = []
+        for row in rows:
+            task = cls({}, fields)
+            dict.update(task, row)
+            for key in tracked:
+                task._track(key, row.get(key))
+            results.append(task)
+        return results
+
+    @classmethod
+    def get_schema(cls, udas=None):
+        """Return the `Schema` of tasks having the given UDAs.
+
+        `udas` may be a dict of UDA fields, as returned by `TaskRc.get_udas`, or a schema
+        already, which is returned as is.  Schemas are shared by the dicts holding the
+        same field objects; prefer `TaskRc.get_schema` all the same, computing the schema
+        only once.
+        """
+        if isinstance(udas, Schema):
+            return udas
+        if udas:
+            # The schema keeps the fields alive, so that their ids are not reused.
+            key = tuple((name, id(field)) for name, field in udas.items())
+            schemas = cls.__dict__.get("_schemas")
+            if schemas is None:
+                schemas = {}
+                setattr(cls, "_schemas", schemas)
+            schema = schemas.get(key)
+            if schema is None:
+                if len(schemas) >= SCHEMA_CACHE_SIZE:
+                    schemas.clear()
+                schema = schemas[key] = Schema(cls.FIELDS, udas)
+            return schema
+
+        # Shared by every task without UDAs.
+        schema = cls.__dict__.get("_default_schema")
+        if schema is None:
+            schema = Schema(cls.FIELDS)
+            setattr(cls, "_default_schema", schema)
+        return schema
 
     @classmethod
     def from_input(cls, input_file=sys.stdin, modify=False, udas=None):
@@ -147,8 +223,17 @@ class Task(dict):
         except KeyError:
             return default
 
-    def _record_change(self, key, from_, to):
-        self._changes.append((key, from_, to))
+    def _track(self, key, value):
+        """Have ``value``, about to be stored at ``key``, report its mutations."""
+        if isinstance(value, Dirtyable):
+            value.track(self._dirty, key)
+        return value
+
+    def _record_change(self, key, from_, to, serialized=None):
+        if key in self._changes:
+            from_ = self._changes[key][0]
+        self._changes[key] = (from_, to, serialized)
+        self._dirty.add(key)
 
     def get_changes(self, serialized=False, keep=False):
         """Get a journal of changes that have occurred
@@ -167,28 +252,29 @@ class Task(dict):
         """
         results = {}
 
-        # Check for explicitly-registered changes
-        for k, f, t in self._changes:
-            if k not in results:
-                results[k] = [f, None]
-            results[k][1] = self._serialize(k, t, self._fields) if serialized else t
-
-        # Check for changes on subordinate items
-        for k, v in self.items():
-            if isinstance(v, Dirtyable):
-                result = v.get_changes(keep=keep)
-                if result:
-                    if not k in results:
-                        results[k] = [result[0], None]
-                    results[k][1] = (
-                        self._serialize(k, result[1], self._fields)
-                        if serialized
-                        else result[1]
-                    )
+        # Only keys explicitly set, or whose list or dict was mutated, can have changed
+        for k in self._dirty:
+            value = dict.get(self, k)
+            result = value.get_changes(keep=keep) if isinstance(value, Dirtyable) else None
+            if k in self._changes:
+                original, recorded, serialized_value = self._changes[k]
+            elif result:
+                original, recorded = result[0], None
+            else:
+                continue
+
+            if not serialized:
+                results[k] = [original, value]
+            elif recorded is value and result is None:
+                # Serialized already when set, and not mutable
+                results[k] = [original, serialized_value]
+            else:
+                results[k] = [original, self._fields.codec.serialize(k, value)]
 
         # Clear out recorded changes
         if not keep:
-            self._changes = []
+            self._changes = {}
+            self._dirty.clear()
 
         return results
 
@@ -210,47 +296,140 @@ class Task(dict):
 
     def serialized(self):
         """Returns a serialized representation of this task."""
+        serialize = self._fields.codec.serialize
         serialized = {}
         for k, v in self.items():
-            serialized[k] = self._serialize(k, v, self._fields)
+            serialized[k] = serialize(k, v)
         return serialized
 
     def serialized_changes(self, keep=False):
         serialized = {}
-        for k, v in self.get_changes(keep=keep).items():
+        for k, v in self.get_changes(serialized=True, keep=keep).items():
             # Here, `v` is a 2-tuple of the field's original value
-            # and the field's new value.
+            # and the field's new serialized value.
             _, to = v
-            serialized[k] = self._serialize(k, to, self._fields)
+            serialized[k] = to
         return serialized
 
     def __setitem__(self, key, value, force=False):
-        if isinstance(value, dict) and not isinstance(value, DirtyableDict):
-            value = DirtyableDict(value)
-        elif isinstance(value, list) and not isinstance(value, DirtyableList):
-            value = DirtyableList(value)
-
-        existing_value = self.get(key)
+        value = _make_dirtyable(value)
+        existing_value = dict.get(self, key)
         if force or value != existing_value:
+            # Make sure we raise an error if this field isn't writable at all.
+            if not self._field_is_writable(key):
+                raise ValueError("%s is a read-only field", key)
+
+            # Serialize to make sure we can, it's better to throw this error
+            # early, and to keep the result for `serialized_changes`.
+            serialized = self._fields.codec.serialize(key, value)
+
             if force or existing_value or value:
                 # Do not attempt to record changes if both the existing
                 # and previous values are Falsy.  We cannot distinguish
                 # between `''` and `None` for...reasons.
-                self._record_change(
-                    key,
-                    self.get(key),
-                    value,
-                )
-
-            # Serialize just to make sure we can; it's better to throw
-            # this error early.
-            self._serialize(key, value, self._fields)
-
-            # Also make sure we raise an error if this field isn't
-            # writable at all.
-            if not self._field_is_writable(key):
-                raise ValueError("%s is a read-only field", key)
+                self._record_change(key, existing_value, value, serialized)
 
-            super(Task, self).__setitem__(key, value)
+            super(Task, self).__setitem__(key, self._track(key, value))
             return True
         return False
+
+
+def _make_dirtyable(value):
+    if isinstance(value, dict) and not isinstance(value, DirtyableDict):
+        return DirtyableDict(value)
+    if isinstance(value, list) and not isinstance(value, DirtyableList):
+        return DirtyableList(value)
+    return value
+
+
+class LazyTask(Task):
+    """A `Task` deserializing each of its values the first time it is read.
+
+    Until then, values are kept as exported by taskwarrior, and `serialized` passes them
+    through as they are.  Reading every value at once, e.g., with `items` or when
+    comparing tasks, deserializes all of them.
+    """
+
+    def __init__(self, data, udas=None):
+        self._fields = self.get_schema(udas)
+        self._changes = {}
+        self._dirty = set()
+        self._raw_keys = set(data)
+
+        dict.__init__(self, data)
+
+    def _load(self, key):
+        """Deserialize the value of `key`, if still raw."""
+        if key in self._raw_keys and dict.__contains__(self, key):
+            value = self._fields.codec.deserialize(key, dict.__getitem__(self, key))
+            dict.__setitem__(self, key, self._track(key, value))
+        self._raw_keys.discard(key)
+
+    def _load_all(self):
+        for key in list(self._raw_keys):
+            self._load(key)
+
+    def __getitem__(self, key):
+        if key in self._raw_keys:
+            self._load(key)
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, value, force=False):
+        self._load(key)
+        return super(LazyTask, self).__setitem__(key, value, force=force)
+
+    def __delitem__(self, key):
+        self._raw_keys.discard(key)
+        dict.__delitem__(self, key)
+
+    def __iter__(self):
+        # Overridden so that `dict(task)` goes through `__getitem__`.
+        return dict.__iter__(self)
+
+    def __eq__(self, other):
+        self._load_all()
+        if isinstance(other, LazyTask):
+            other._load_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        self._load_all()
+        return dict.__repr__(self)
+
+    def items(self):
+        self._load_all()
+        return dict.items(self)
+
+    def values(self):
+        self._load_all()
+        return dict.values(self)
+
+    def copy(self):
+        self._load_all()
+        return dict.copy(self)
+
+    def pop(self, key, *default):
+        self._load(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._load_all()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        self._load(key)
+        return dict.setdefault(self, key, default)
+
+    def serialized(self):
+        """Returns a serialized representation of this task."""
+        serialize = self._fields.codec.serialize
+        serialized = {}
+        for k, v in dict.items(self):
+            if k in self._raw_keys:
+                serialized[k] = v
+            else:
+                serialized[k] = serialize(k, v)
+        return serialized
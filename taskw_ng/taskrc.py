@@ -2,6 +2,7 @@ import logging
 import os
 
 from taskw_ng.fields import ChoiceField, DateField, DurationField, NumericField, StringField
+from taskw_ng.task import Task
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,8 @@ class TaskRc(dict):
 
     def __init__(self, path=None, overrides=None):
         self.overrides = overrides if overrides else {}
+        self._udas = None
+        self._schema = None
         if path:
             self.path = os.path.normpath(os.path.expanduser(path))
             config = self._read(self.path)
@@ -165,6 +168,12 @@ class TaskRc(dict):
         raise TypeError("TaskRc objects are immutable")
 
     def get_udas(self):
+        # The same fields every time, so that `Task.get_schema` shares their schema.
+        if self._udas is None:
+            self._udas = self._read_udas()
+        return dict(self._udas)
+
+    def _read_udas(self):
         raw_udas = self.get("uda", {})
         udas = {}
 
@@ -185,5 +194,11 @@ class TaskRc(dict):
 
         return udas
 
+    def get_schema(self):
+        """Return the `Schema` of the tasks of this taskrc, shared by all of them."""
+        if self._schema is None:
+            self._schema = Task.get_schema(self.get_udas())
+        return self._schema
+
     def __str__(self):
         return "TaskRc file at {path}".format(path=self.path)
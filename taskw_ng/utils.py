@@ -1,13 +1,18 @@
 """ Various utilties """
 
 import datetime
+import functools
+import itertools
+import json
+import os
 import re
 from collections import OrderedDict
 from operator import itemgetter
 
-import dateutil.tz
-import packaging.version
-import pytz
+from taskw_ng.dates import format_date
+
+# dateutil, pytz and packaging are imported where used: they are slow to import, and
+# not needed by many scripts using this module.
 
 DATE_FORMAT = "%Y%m%dT%H%M%SZ"
 
@@ -51,18 +56,27 @@ logical_replacements = OrderedDict(
 )
 
 
+@functools.lru_cache(maxsize=None)
+def parse_version(value):
+    """Parse a version number, e.g., the output of ``task --version``
+
+    Versions are only parsed once; the same `Version` is returned for the same string.
+
+    >>> parse_version("2.6.2") >= parse_version("2.4")
+    True
+    """
+    import packaging.version
+
+    return packaging.version.parse(value)
+
+
 def encode_task_value(key, value, query=False):
     if value is None:
         value = ""
-    elif isinstance(value, datetime.datetime):
-        if not value.tzinfo:
-            #  Dates not having timezone information should be
-            #  assumed to be in local time
-            value = value.replace(tzinfo=dateutil.tz.tzlocal())
-        #  All times should be converted to UTC before serializing
-        value = value.astimezone(pytz.utc).strftime(DATE_FORMAT)
     elif isinstance(value, datetime.date):
-        value = value.strftime(DATE_FORMAT)
+        #  Dates not having timezone information are assumed to be in local
+        #  time, and all times are converted to UTC before serializing
+        value = format_date(value)
     elif isinstance(value, str):
         if query:
             # In some contexts, parentheses are interpreted for use in
@@ -95,7 +109,7 @@ def encode_query(value, version, query=True):
                 )
             )
         else:
-            if k.endswith(".is") and version >= packaging.version.parse("2.4"):
+            if k.endswith(".is") and version >= parse_version("2.4"):
                 args.append('%s == "%s"' % (k[:-3], encode_task_value(k, v, query=query)))
             else:
                 args.append("%s:%s" % (k, encode_task_value(k, v, query=query)))
@@ -126,6 +140,96 @@ def encode_task_experimental(task):
     ]
 
 
+def encode_task_json(task):
+    """Convert a dict-like task to the JSON object understood by `task import`
+
+    Dates are converted to UTC, control characters are stripped from strings, sets
+    become sorted lists and empty values are dropped, since an attribute missing from an
+    imported task is unset.
+    Annotations are expected to be encoded already -- see `encode_annotations_json`.
+    """
+    encoded = {}
+    for k, v in task.items():
+        if k in ("id", "urgency") or v is None or v == "":
+            continue
+        if isinstance(v, (datetime.datetime, datetime.date)):
+            v = encode_task_value(k, v)
+        elif isinstance(v, str):
+            v = clean_ctrl_chars_str(v)
+        elif isinstance(v, (set, frozenset)):
+            v = sorted(clean_ctrl_chars_str(str(item)) for item in v)
+        elif isinstance(v, (list, tuple)) and k != "annotations":
+            v = [clean_ctrl_chars_str(str(item)) for item in v]
+        encoded[k] = v
+    return encoded
+
+
+def encode_annotations_json(annotations, original=(), now=None):
+    """Convert annotations to the list of objects understood by `task import`
+
+    Taskwarrior keys annotations on their entry date, so every annotation needs a
+    distinct one.  Annotations that already exist in `original` (a list of annotation
+    objects as exported by taskwarrior) or that carry their own entry date keep it; the
+    rest get consecutive entry dates starting at `now`.
+
+    >>> encode_annotations_json(
+    ...     ["first", "second"], now=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    ... )  # doctest: +NORMALIZE_WHITESPACE
+    [{'entry': '20240101T000000Z', 'description': 'first'},
+     {'entry': '20240101T000001Z', 'description': 'second'}]
+    """
+    existing = {}
+    for annotation in original:
+        if isinstance(annotation, dict):
+            existing[make_annotation_comparable(annotation["description"])] = annotation
+    used_entries = set(annotation["entry"] for annotation in existing.values())
+
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    now = now.replace(microsecond=0)
+
+    encoded = []
+    for annotation in annotations:
+        description = clean_ctrl_chars_str(get_annotation_value(annotation))
+        comparable = make_annotation_comparable(description)
+        if comparable in existing:
+            encoded.append(existing[comparable])
+            continue
+
+        entry = annotation.get("entry") if isinstance(annotation, dict) else None
+        if not entry:
+            entry = now.strftime(DATE_FORMAT)
+            while entry in used_entries:
+                now += datetime.timedelta(seconds=1)
+                entry = now.strftime(DATE_FORMAT)
+        used_entries.add(entry)
+        encoded.append({"entry": entry, "description": description})
+    return encoded
+
+
+def diff_task_fields(original, task):
+    """Return the fields of `task` whose value differs from the one in `original`
+
+    Values are compared in their `encode_task_experimental` form, so that, e.g., a
+    datetime and the corresponding taskwarrior timestamp are considered equal.  Fields
+    missing from `task` are ignored.
+
+    >>> diff_task_fields(
+    ...     {"description": "foo", "tags": ["a", "b"], "project": "bar"},
+    ...     {"description": "foo", "tags": ["a", "b"], "priority": "H"},
+    ... )
+    {'priority': 'H'}
+    """
+    changed = {}
+    for key, value in task.items():
+        original_value = original.get(key)
+        if encode_task_experimental({key: value}) != encode_task_experimental(
+            {key: original_value}
+        ):
+            changed[key] = value
+    return changed
+
+
 def encode_task(task):
     """Convert a dict-like task to its string representation"""
     # First, clean the task:
@@ -168,6 +272,39 @@ def decode_task(line):
     return task
 
 
+JSON_DECODER = json.JSONDecoder()
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(text):
+    """Yield the items of a JSON array one at a time, as they are parsed
+
+    Contrary to ``json.loads``, the whole array is never built, so that each item can be
+    dropped, or shrunk, before the next one is parsed.
+
+    >>> list(iter_json_array('[{"uuid": "a"},\\n {"uuid": "b"}]'))
+    [{'uuid': 'a'}, {'uuid': 'b'}]
+    >>> list(iter_json_array(' [ ] '))
+    []
+    """
+    pos = JSON_WHITESPACE.match(text).end()
+    if text[pos : pos + 1] != "[":
+        raise json.JSONDecodeError("Expecting '['", text, pos)
+    pos = JSON_WHITESPACE.match(text, pos + 1).end()
+    if text[pos : pos + 1] == "]":
+        return
+
+    while True:
+        item, pos = JSON_DECODER.raw_decode(text, pos)
+        yield item
+        pos = JSON_WHITESPACE.match(text, pos).end()
+        if text[pos : pos + 1] == "]":
+            return
+        if text[pos : pos + 1] != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = JSON_WHITESPACE.match(text, pos + 1).end()
+
+
 def make_annotation_comparable(annotation):
     """Make an annotation comparable.
 
@@ -254,3 +391,115 @@ CTRLCHAR = re.compile(b"[\x00-\x08\x0e-\x1f]")
 def clean_ctrl_chars(s):
     """Clean string removing most (but not all) control characters"""
     return CTRLCHAR.sub(b"", s)
+
+
+# Terminal escape characters - bells, backspaces, form feeds and escapes - that may show up
+# in the output of taskwarrior, mapped to question marks.
+OUTPUT_CTRLCHARS = bytes.maketrans(b"\a\b\f\x1b", b"????")
+
+
+def clean_output(data):
+    r"""Replace the terminal escape characters in the raw output of taskwarrior
+
+    Works on bytes, in a single pass, since none of these characters can be part of a
+    multibyte utf-8 sequence.
+
+    >>> clean_output(b"ring\a the\x1b[1m bell")
+    b'ring? the?[1m bell'
+    """
+    return data.translate(OUTPUT_CTRLCHARS)
+
+
+CTRLCHAR_STR = re.compile("[\x00-\x08\x0e-\x1f]")
+
+
+def clean_ctrl_chars_str(s):
+    """Same as `clean_ctrl_chars` but operating on unicode strings"""
+    return CTRLCHAR_STR.sub("", s)
+
+
+def get_max_command_length():
+    """Return the maximum length, in bytes, of the arguments and environment of a new process
+
+    Falls back to the (much stricter) limit of Windows' CreateProcess on platforms that
+    don't expose ARG_MAX.
+    """
+    try:
+        return os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        return 32767
+
+
+def chunk_args(args, max_length, max_count=None):
+    """Split a list of command-line arguments into consecutive chunks
+
+    Every chunk takes up at most `max_length` bytes on the command line (accounting for
+    the terminating NUL and the argv pointer of each argument) and holds at most
+    `max_count` arguments.
+
+    >>> list(chunk_args(["aaa", "bbb", "ccc"], max_length=20))
+    [['aaa'], ['bbb'], ['ccc']]
+    >>> list(chunk_args(["aaa", "bbb", "ccc"], max_length=100, max_count=2))
+    [['aaa', 'bbb'], ['ccc']]
+    """
+    chunk = []
+    chunk_length = 0
+    for arg in args:
+        arg_length = len(str(arg).encode("utf-8")) + 1 + 8
+        if chunk and (
+            chunk_length + arg_length > max_length
+            or (max_count is not None and len(chunk) >= max_count)
+        ):
+            yield chunk
+            chunk = []
+            chunk_length = 0
+        chunk.append(arg)
+        chunk_length += arg_length
+    if chunk:
+        yield chunk
+
+
+def chunked(iterable, size):
+    """Yield consecutive lists of at most `size` items from `iterable`
+
+    >>> list(chunked(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_uuid_shards(count):
+    """Return filters splitting tasks into `count` disjoint sets by their UUIDs
+
+    There are at most 16 of them, one per first hex digit; an empty filter stands for
+    all tasks.
+
+    >>> get_uuid_shards(1)
+    ['']
+    >>> get_uuid_shards(8)[-1]
+    '(uuid.startswith:e or uuid.startswith:f)'
+    >>> [shard.count("uuid") for shard in get_uuid_shards(3)]
+    [6, 5, 5]
+    >>> len(get_uuid_shards(32))
+    16
+    """
+    count = max(1, min(count, 16))
+    if count == 1:
+        return [""]
+
+    digits = "0123456789abcdef"
+    size, remainder = divmod(len(digits), count)
+    shards = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < remainder else 0)
+        shards.append(
+            "(%s)" % " or ".join("uuid.startswith:%s" % digit for digit in digits[start:end])
+        )
+        start = end
+    return shards
@@ -3,23 +3,31 @@
 This module mainly contains an abstract base class and the TaskWarrior implementation
 """
 import abc
+import atexit
+import contextlib
 import copy
+import datetime
 import json
 import logging
 import os
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
 import uuid
+import weakref
 from typing import Any, Mapping, Optional, Sequence, Union
 
-import kitchen.text.converters
-from packaging import version
-
 import taskw_ng.utils
+from taskw_ng.batch import Batch
+from taskw_ng.buffer import WriteBuffer
 from taskw_ng.exceptions import TaskwarriorError
-from taskw_ng.task import Task
+from taskw_ng.record import TaskRecord
+from taskw_ng.table import TaskTable
+from taskw_ng.task import LazyTask, Task
 from taskw_ng.taskrc import TaskRc
+from taskw_ng.writer import get_write_queue, is_write
 
 logger = logging.getLogger(__name__)
 
@@ -181,110 +189,374 @@ class TaskWarrior(TaskWarriorBase):
             "confirmation": "no",
         },
         "recurrence": {"confirmation": "no"},
+        # Never ask for confirmation when a command affects many tasks at once.
+        "bulk": "0",
     }
 
+    # Maximum number of tasks sent to, or requested from, a single taskwarrior invocation
+    # by the bulk methods.
+    BULK_CHUNK_SIZE = 1000
+
+    # Defaults for the buffer used with `write_buffer=True` - see `WriteBuffer`.
+    WRITE_BUFFER_MAX_SIZE = 100
+    WRITE_BUFFER_MAX_DELAY = 0.5
+
+    # Where the versions of the taskwarrior binaries seen so far are kept - see
+    # `get_version`.  None disables the cache.
+    VERSION_CACHE_FILENAME = os.path.join(
+        os.getenv("XDG_CACHE_HOME", "~/.cache"), "taskw_ng", "versions.json"
+    )
+
+    # Default number of exports run in parallel by `load_tasks_and_filter` and
+    # `filter_tasks` - see `export_shards`.
+    EXPORT_SHARDS = 1
+
     def __init__(
         self,
         config_filename=TASKRC,
         config_overrides=None,
         marshal=False,
+        refetch=True,
+        write_buffer=False,
+        write_queue=False,
+        export_shards=None,
+        fast_spawn=False,
     ):
+        """
+        :param marshal: Whether tasks are returned as `Task` objects, holding python
+            values (datetimes, UUIDs, ...) and tracking changes, rather than as plain
+            dicts.  With ``"compact"``, tasks read from taskwarrior are instead
+            returned as read-only `TaskRecord` objects, taking much less memory; see
+            `TaskRecord.to_task`.  With ``"lazy"``, they are returned as `LazyTask`
+            objects, only deserializing the values actually read.
+        :param refetch: Whether methods modifying a task read it back from taskwarrior in
+            order to return its up-to-date version.  When disabled, they instead return a
+            locally patched copy of the task they were given, or just the UUID of the task
+            if they were only given a way to identify it.  Every such method also accepts
+            a `refetch` argument overriding this setting for a single call.
+        :param write_buffer: Whether `task_update` only records the changes to the task,
+            to be written later on along with the changes made to other tasks meanwhile.
+            Pending changes are written when `flush` is called, before any other
+            taskwarrior command runs, or when the `WRITE_BUFFER_MAX_SIZE` or
+            `WRITE_BUFFER_MAX_DELAY` thresholds are met.  `get_task(uuid=...)` takes
+            pending changes into account without writing them.
+        :param write_queue: Whether commands changing tasks go through a queue shared by
+            every client using the same data location, so that threads sharing a client
+            don't fight over taskwarrior's lock.  Reads still run concurrently, and
+            compatible queued writes are merged.  See `write_queue_stats`.
+        :param export_shards: Into how many disjoint queries, running in parallel,
+            `load_tasks_and_filter` and `filter_tasks` split their exports.  Queries are
+            split by the first digit of the UUIDs of the tasks.  Tasks are then no
+            longer returned in taskwarrior's order.  Defaults to
+            `EXPORT_SHARDS`; both methods also accept a `shards` argument overriding this
+            setting for a single call.
+        :param fast_spawn: Whether to let file descriptors be inherited by taskwarrior,
+            which lets `subprocess` start it with ``posix_spawn`` rather than
+            ``fork``/``exec``.  Only file descriptors explicitly made inheritable are
+            affected.
+        """
+        # Checked here rather than on import, so that importing this module stays cheap.
+        if not self.can_use():
+            raise UnsupportedVersionException()
+
         super(TaskWarrior, self).__init__(config_filename)
         self.config_overrides = config_overrides if config_overrides else {}
         self._marshal = marshal
+        self._refetch = refetch
+        self._batch = None
+        self._write_buffer = None
+        if write_buffer:
+            self._write_buffer = WriteBuffer(
+                lambda tasks: self.task_update_many(tasks, refetch=False),
+                max_size=self.WRITE_BUFFER_MAX_SIZE,
+                max_delay=self.WRITE_BUFFER_MAX_DELAY,
+            )
+            atexit.register(_flush_write_buffer, weakref.ref(self._write_buffer))
         self.config = TaskRc(config_filename, overrides=config_overrides)
-
-        if self.get_version() >= version.parse("2.4"):
+        self._export_shards = export_shards or self.EXPORT_SHARDS
+        self._spawn_kwargs = {"close_fds": False} if fast_spawn else {}
+        # See `_get_command_prefix`.
+        self._command_prefix = None
+        self._write_queue = None
+        if write_queue:
+            self._write_queue = get_write_queue(self._get_data_location())
+
+        if self.get_version() >= taskw_ng.utils.parse_version("2.4"):
             self.DEFAULT_CONFIG_OVERRIDES["verbose"] = "new-uuid"
         # Combination of
         # https://github.com/GothenburgBitFactory/taskwarrior/issues/1953
         # and dictionaries random order may cause task add failures in
         # Python versions before 3.7
-        if self.get_version() >= version.parse("2.5.3") and sys.hexversion < 0x03070000:
+        if (
+            self.get_version() >= taskw_ng.utils.parse_version("2.5.3")
+            and sys.hexversion < 0x03070000
+        ):
             warnings.once(
                 "Python < 3.7 with TaskWarrior => 2.5.3 is not suppoprted. "
                 "Task addition may fail."
             )
 
-    def get_configuration_override_args(self):
+    def get_configuration_override_args(self, overrides=None):
         config_overrides = self.DEFAULT_CONFIG_OVERRIDES.copy()
         config_overrides.update(self.config_overrides)
+        if overrides:
+            config_overrides.update(overrides)
         return taskw_ng.utils.convert_dict_to_override_args(config_overrides)
 
-    def _execute(self, *args):
+    def _execute(self, *args, stdin=None, raw=False):
         """Execute a given taskwarrior command with arguments
 
-        Returns a 2-tuple of stdout and stderr (respectively).
+        If given, `stdin` is encoded to utf-8 and fed to the command's standard input.
+
+        Returns a 2-tuple of stdout and stderr (respectively), left as bytes if `raw` is
+        set.
 
         """
-        command = (
-            [
-                "task",
-            ]
-            + self.get_configuration_override_args()
-            + [str(arg) for arg in args]
-        )
-        env = os.environ.copy()
-        env["TASKRC"] = self.config_filename
+        # Whatever the command, it should see the changes made so far.
+        self.flush()
 
-        # subprocess is expecting bytestrings only, so nuke unicode if present
-        # and remove control characters
-        for i in range(len(command)):
-            if isinstance(command[i], str):
-                command[i] = taskw_ng.utils.clean_ctrl_chars(command[i].encode("utf-8"))
+        if self._write_queue is not None and is_write(args):
+            stdout, stderr = self._write_queue.submit(self, args, stdin=stdin)
+        else:
+            stdout, stderr = self._run(*args, stdin=stdin)
+
+        if raw:
+            return stdout, stderr
+        return self._decode(stdout), self._decode(stderr)
+
+    def _run(self, *args, stdin=None):
+        """Run a taskwarrior command right away - see `_execute`.
+
+        The output is returned as bytes.
+        """
+        command, env = self._get_command(args)
 
         try:
             proc = subprocess.Popen(
                 command,
                 env=env,
+                stdin=subprocess.PIPE if stdin is not None else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
+                **self._spawn_kwargs,
+            )
+            stdout, stderr = proc.communicate(
+                stdin.encode("utf-8") if stdin is not None else None
             )
-            stdout, stderr = proc.communicate()
         except FileNotFoundError:
             raise FileNotFoundError("Unable to find the 'task' command-line tool.")
 
-        if proc.returncode != 0:
-            raise TaskwarriorError(command, stderr, stdout, proc.returncode)
+        return self._check_output(command, proc.returncode, stdout, stderr)
+
+    def _get_command(self, args, overrides=None):
+        """Return the command line and environment to run a taskwarrior command with.
+
+        `overrides` are configuration overrides applying to this command only.
+        """
+        if overrides:
+            prefix = self._build_command_prefix(overrides)
+        else:
+            prefix = self._get_command_prefix()
+
+        # subprocess is expecting bytestrings only, so nuke unicode if present
+        # and remove control characters
+        return (
+            prefix
+            + [taskw_ng.utils.clean_ctrl_chars(str(arg).encode("utf-8")) for arg in args]
+        ), self._get_environment()
+
+    def _get_command_prefix(self):
+        """Return the start of every command line.
 
-        # We should get bytes from the outside world.  Turn those into unicode
-        # as soon as we can.
+        It is only computed again when the configuration overrides, the configuration
+        file or the ``PATH`` the executable is looked up in change.
+        """
+        key = (
+            self.config_filename,
+            self.config_overrides,
+            self.DEFAULT_CONFIG_OVERRIDES,
+            os.environ.get("PATH"),
+        )
+        cached = self._command_prefix
+        if cached is None or cached[0] != key:
+            cached = self._command_prefix = (copy.deepcopy(key), self._build_command_prefix())
+        return cached[1]
+
+    def _build_command_prefix(self, overrides=None):
+        # Resolving the executable once spares a lookup in every directory of PATH on
+        # each call, and is required for `subprocess` to use posix_spawn.
+        command = [shutil.which("task") or "task"] + self.get_configuration_override_args(
+            overrides
+        )
+        return [taskw_ng.utils.clean_ctrl_chars(arg.encode("utf-8")) for arg in command]
+
+    def _get_environment(self):
+        """Return the environment to run taskwarrior in.
+
+        Copied for every command, so that changes to the environment of the process,
+        e.g., to ``TASKDATA``, are taken into account.
+        """
+        env = os.environ.copy()
+        env["TASKRC"] = self.config_filename
+        return env
+
+    def _check_output(self, command, returncode, stdout, stderr):
+        """Return the raw output of a finished command, as a 2-tuple of bytes.
+
+        Raises a `TaskwarriorError` if the command failed.
+        """
+        if returncode != 0:
+            raise TaskwarriorError(command, stderr, stdout, returncode)
+
+        # strip any crazy terminal escape characters like bells, backspaces,
+        # and form feeds, before anything gets decoded
+        return taskw_ng.utils.clean_output(stdout), taskw_ng.utils.clean_output(stderr)
+
+    def _decode(self, data):
         # Everything going into and coming out of taskwarrior *should* be
         # utf-8, but there are weird edge cases where something totally unusual
         # made it in.. so we need to be able to handle (or at least try to
         # handle) whatever.  Kitchen tries its best.
         try:
-            stdout = stdout.decode(self.config.get("encoding", "utf-8"))
-        except UnicodeDecodeError as e:
-            stdout = kitchen.text.converters.to_unicode(stdout)
+            return data.decode(self.config.get("encoding", "utf-8"))
+        except UnicodeDecodeError:
+            import kitchen.text.converters
+
+            return kitchen.text.converters.to_unicode(data)
+
+    def _get_json(self, *args):
+        return self._parse_json(self._execute(*args, raw=True)[0])
+
+    def _parse_json(self, data):
+        """Parse JSON output of taskwarrior, given as bytes.
+
+        The bytes go straight to the JSON parser unless they aren't valid utf-8, in which
+        case they are decoded like any other output first.
+        """
         try:
-            stderr = stderr.decode(self.config.get("encoding", "utf-8"))
-        except UnicodeDecodeError as e:
-            stderr = kitchen.text.converters.to_unicode(stderr)
+            return json.loads(data)
+        except UnicodeDecodeError:
+            return json.loads(self._decode(data))
 
-        # strip any crazy terminal escape characters like bells, backspaces,
-        # and form feeds
-        for c in ("\a", "\b", "\f", ""):
-            stdout = stdout.replace(c, "?")
-            stderr = stderr.replace(c, "?")
+    def _get_task_objects(self, *args, fields=None):
+        return self._parse_task_objects(self._execute(*args, raw=True)[0], fields)
 
-        return stdout, stderr
+    def _parse_task_objects(self, data, fields=None):
+        """Turn the output of ``task export``, given as bytes, into task objects.
 
-    def _get_json(self, *args):
-        return json.loads(self._execute(*args)[0])
+        If `fields` are given, every other attribute is dropped as soon as each task is
+        parsed, before it gets marshaled.
+        """
+        if fields is None:
+            json = self._parse_json(data)
+            if isinstance(json, dict):
+                return self._get_task_object(json)
+            return self._get_task_object_list(json)
+
+        fields = list(fields)
+        return self._get_task_object_list(
+            [
+                {key: task[key] for key in fields if key in task}
+                for task in taskw_ng.utils.iter_json_array(self._decode(data))
+            ]
+        )
+
+    def _get_max_args_length(self):
+        """Number of bytes available to the arguments of a single command."""
+        prefix, env = self._get_command_prefix(), self._get_environment()
+        env_length = sum(len(k) + len(v) + 2 for k, v in env.items())
+        overhead = env_length + sum(len(arg) + 1 for arg in prefix)
+        # Leave some headroom for the arguments of the command itself.
+        return max(taskw_ng.utils.get_max_command_length() - overhead - 4096, 4096)
+
+    def _get_tasks_by_uuids(self, uuids, raw=False):
+        """Export the given tasks, in the same order as `uuids`.
+
+        The UUIDs are split over as many ``task export`` invocations as needed to keep
+        each command line under the platform's limit.  If `raw` is set, the tasks are
+        returned as exported by taskwarrior, regardless of the marshal setting.
+        """
+        uuids = [str(task_uuid) for task_uuid in uuids]
+        max_length = self._get_max_args_length()
+        export = self._get_json if raw else self._get_task_objects
+
+        tasks = {}
+        for chunk in taskw_ng.utils.chunk_args(uuids, max_length, self.BULK_CHUNK_SIZE):
+            for task in export(*(chunk + ["export"])):
+                tasks[str(task["uuid"])] = task
 
-    def _get_task_objects(self, *args):
-        json = self._get_json(*args)
-        if isinstance(json, dict):
-            return self._get_task_object(json)
-        value = [self._get_task_object(j) for j in json]
-        return value
+        return [tasks[task_uuid] for task_uuid in uuids if task_uuid in tasks]
+
+    def _import_tasks(self, tasks):
+        """Write the given JSON-ready tasks with as few ``task import`` calls as possible.
+
+        Tasks that already exist are replaced by the imported version.
+        """
+        for chunk in taskw_ng.utils.chunked(tasks, self.BULK_CHUNK_SIZE):
+            # One object per line is understood by every supported taskwarrior version.
+            self._execute(
+                "import",
+                stdin="\n".join(json.dumps(task, ensure_ascii=False) for task in chunk),
+            )
+
+    def _execute_on_uuids(self, uuids, *args, refetch=None):
+        """Run a command on many tasks at once, e.g., ``task <uuid1> <uuid2> done``.
+
+        The UUIDs are split over as many invocations as needed to keep each command line
+        under the platform's limit.  Returns the affected tasks, in the same order as
+        `uuids`, or just their UUIDs if refetch is off.
+        """
+        uuids = [str(task_uuid) for task_uuid in uuids]
+        max_length = self._get_max_args_length() - sum(
+            len(str(arg).encode("utf-8")) + 1 + 8 for arg in args
+        )
+
+        for chunk in taskw_ng.utils.chunk_args(uuids, max_length, self.BULK_CHUNK_SIZE):
+            self._execute(*(chunk + list(args)))
+
+        if not self._should_refetch(refetch):
+            return uuids
+        return self._get_tasks_by_uuids(uuids)
+
+    def flush(self):
+        """Write any changes pending in the write buffer."""
+        if self._write_buffer is not None:
+            self._write_buffer.flush()
+
+    def write_queue_stats(self):
+        """Return statistics about the contention on the write queue.
+
+        See `WriteQueue.stats` for the available values, or None if the write queue is
+        not in use.
+        """
+        if self._write_queue is None:
+            return None
+        return self._write_queue.stats()
+
+    def _should_refetch(self, refetch):
+        return self._refetch if refetch is None else refetch
+
+    def _refetch_task(self, task_uuid, refetch):
+        """Return the up-to-date version of a task, or just its UUID if refetch is off."""
+        if not self._should_refetch(refetch):
+            return str(task_uuid)
+        return self.get_task(uuid=task_uuid)[1]
 
     def _get_task_object(self, obj):
+        if self._marshal == "compact":
+            return TaskRecord(obj, udas=self.config.get_schema())
+        if self._marshal == "lazy":
+            return LazyTask(obj, udas=self.config.get_schema())
         if self._marshal:
-            return Task(obj, udas=self.config.get_udas())
+            return Task(obj, udas=self.config.get_schema())
         return obj
 
+    def _get_task_object_list(self, objs):
+        """Like `_get_task_object`, for a list of tasks."""
+        if self._marshal and self._marshal not in ("compact", "lazy"):
+            return Task.bulk_from_export(objs, udas=self.config.get_schema())
+        return [self._get_task_object(obj) for obj in objs]
+
     def _stub_task(self, description, tags=None, **kw):
         """Given a description, stub out a task dict."""
 
@@ -303,7 +575,7 @@ class TaskWarrior(TaskWarriorBase):
         task.update(kw)
 
         if self._marshal:
-            return Task.from_stub(task, udas=self.config.get_udas())
+            return Task.from_stub(task, udas=self.config.get_schema())
 
         return task
 
@@ -311,25 +583,44 @@ class TaskWarrior(TaskWarriorBase):
     def can_use(cls):
         """Returns true if runtime requirements of experimental mode are met"""
         try:
-            return cls.get_version() >= version.parse("2.5")
+            return cls.get_version() >= taskw_ng.utils.parse_version("2.5")
         except FileNotFoundError:
             # FileNotFound is raised if subprocess.Popen fails to find
             # the executable.
             return False
 
     @classmethod
-    def get_version(cls) -> version.Version:
+    def get_version(cls) -> "packaging.version.Version":
+        """Return the version of taskwarrior.
+
+        Running ``task --version`` is avoided whenever possible: the result is kept for
+        the lifetime of the process, and in `VERSION_CACHE_FILENAME` for as long as the
+        ``task`` binary isn't replaced.
+        """
         if (taskwarrior_version := getattr(cls, "taskwarrior_version", None)) is not None:
             return taskwarrior_version
 
-        try:
-            taskwarrior_version = subprocess.Popen(
-                ["task", "--version"], stdout=subprocess.PIPE
-            ).communicate()[0]
-        except FileNotFoundError:
+        executable = shutil.which("task")
+        if executable is None:
             raise FileNotFoundError("Unable to find the 'task' command-line tool.")
+        executable = os.path.realpath(executable)
+        mtime = os.stat(executable).st_mtime_ns
+
+        cache = _read_version_cache(cls.VERSION_CACHE_FILENAME)
+        cached = cache.get(executable)
+        if cached is not None and cached.get("mtime") == mtime:
+            taskwarrior_version = cached["version"]
+        else:
+            taskwarrior_version = (
+                subprocess.Popen([executable, "--version"], stdout=subprocess.PIPE)
+                .communicate()[0]
+                .decode()
+                .strip()
+            )
+            cache[executable] = {"mtime": mtime, "version": taskwarrior_version}
+            _write_version_cache(cls.VERSION_CACHE_FILENAME, cache)
 
-        cls.taskwarrior_version = version.parse(taskwarrior_version.decode())
+        cls.taskwarrior_version = taskw_ng.utils.parse_version(taskwarrior_version)
         return cls.taskwarrior_version
 
     def sync(self, init=False):
@@ -339,7 +630,12 @@ class TaskWarrior(TaskWarriorBase):
             self._execute("sync")
 
     def load_tasks_and_filter(
-        self, command, filter_: Optional[Union[Mapping[str, Any], Sequence[str], str]] = None
+        self,
+        command,
+        filter_: Optional[Union[Mapping[str, Any], Sequence[str], str]] = None,
+        *,
+        shards=None,
+        fields=None,
     ):
         """Returns a dictionary of tasks for a list of command.
         The filter_ could either be
@@ -349,34 +645,97 @@ class TaskWarrior(TaskWarriorBase):
           filter_=["+test_tag", "+OVERDUE"] we'll query taskwarrior with the filter "+test_tag
           +OVEREDUE" which will basically ask for tasks that have both these tags
         * a dict (TODO - add example)
-        """
-        if filter_ is None:
-            query_args = ""
-        elif isinstance(filter_, str):
-            query_args = filter_
-        elif isinstance(filter_, dict):
-            query_args = " ".join(taskw_ng.utils.encode_query(filter_, self.get_version()))
-        else:
-            query_args = " ".join(filter_)
 
-        results = dict(
-            (db, self._get_task_objects(f"status:{db}", query_args, "export"))
-            for db in Command.files(command)
+        If `fields` are given, the tasks only have these attributes, along with their
+        ``status``.
+        """
+        query_args = self._group_filter(self._encode_filter(filter_))
+        shards = shards or self._export_shards
+        if fields is not None:
+            # Needed to sort the tasks by status.
+            fields = list(fields) + ["status"]
+
+        statuses, status_filter = self._get_status_filter(command)
+        exports = self._export_shards_in_parallel(
+            [
+                [status_filter, uuid_shard, query_args, "export"]
+                for uuid_shard in taskw_ng.utils.get_uuid_shards(shards)
+            ],
+            shards,
+            fields,
         )
+        return self._partition_by_status(statuses, exports)
+
+    def _get_status_filter(self, command):
+        """Return the statuses of the tasks `command` loads, and a filter matching them.
+
+        A single export for every status gives a consistent snapshot, and spares
+        taskwarrior from loading everything once per status.
+        """
+        statuses = list(Command.files(command))
+        if "pending" in statuses:
+            statuses.append("waiting")
+
+        status_filter = " or ".join(f"status:{status}" for status in statuses)
+        if len(statuses) > 1:
+            status_filter = f"({status_filter})"
+        return statuses, status_filter
+
+    def _partition_by_status(self, statuses, exports):
+        """Sort the tasks of the given exports by status, as `load_tasks` returns them."""
+        results = dict((status, []) for status in statuses)
+        for tasks in exports:
+            for task in tasks:
+                # A filter may still let through tasks of other statuses.
+                tasks_with_status = results.get(task["status"])
+                if tasks_with_status is not None:
+                    tasks_with_status.append(task)
 
         # 'waiting' tasks are returned separately from 'pending' tasks
         # Here we merge the waiting list back into the pending list.
         if "pending" in results:
-            results["pending"].extend(
-                self._get_task_objects("status:waiting", query_args, "export")
-            )
+            results["pending"].extend(results.pop("waiting"))
 
         return results
 
-    def load_tasks(self, command="all") -> dict:
-        return self.load_tasks_and_filter(command=command, filter_={})
+    def _export_shards_in_parallel(self, exports, max_workers, fields=None):
+        """Run the given exports, `max_workers` at a time, returning their tasks in order."""
+        if max_workers <= 1 or len(exports) <= 1:
+            return [self._get_task_objects(*args, fields=fields) for args in exports]
+
+        import concurrent.futures
+
+        # Every export should see the changes made so far; flush them once and for all.
+        self.flush()
+        with concurrent.futures.ThreadPoolExecutor(min(max_workers, len(exports))) as pool:
+            return list(
+                pool.map(lambda args: self._get_task_objects(*args, fields=fields), exports)
+            )
+
+    def _encode_filter(self, filter_):
+        """Turn a filter, as accepted by `load_tasks_and_filter`, into a query string."""
+        if filter_ is None:
+            return ""
+        elif isinstance(filter_, str):
+            return filter_
+        elif isinstance(filter_, dict):
+            return " ".join(taskw_ng.utils.encode_query(filter_, self.get_version()))
+        return " ".join(filter_)
+
+    @staticmethod
+    def _group_filter(query_args):
+        """Parenthesize a query string, so that it is and-ed with other filters as a whole.
+
+        Otherwise, e.g., ``(status:pending) +a or +b`` would match every task with ``+b``.
+        """
+        if not query_args.strip():
+            return ""
+        return f"( {query_args} )"
+
+    def load_tasks(self, command="all", *, fields=None) -> dict:
+        return self.load_tasks_and_filter(command=command, filter_={}, fields=fields)
 
-    def filter_tasks(self, filter_):
+    def filter_tasks(self, filter_, *, shards=None, fields=None):
         """Return a filtered list of tasks from taskwarrior.
 
         Filter dict should be a dictionary mapping filter constraints
@@ -396,9 +755,99 @@ class TaskWarrior(TaskWarriorBase):
         Filters can be quite complex, and are documented on Taskwarrior's
         website.
 
+        If `fields` are given, the tasks only have these attributes - e.g.,
+        ``fields=["uuid", "project", "due"]``.  The other ones are never marshaled.
+
         """
         query_args = taskw_ng.utils.encode_query(filter_, self.get_version())
-        return self._get_task_objects(*(query_args + ["export"]))
+        shards = shards or self._export_shards
+        if shards <= 1:
+            return self._get_task_objects(*(query_args + ["export"]), fields=fields)
+
+        exports = self._export_shards_in_parallel(
+            [
+                [uuid_shard] + query_args + ["export"]
+                for uuid_shard in taskw_ng.utils.get_uuid_shards(shards)
+            ],
+            shards,
+            fields,
+        )
+        return [task for tasks in exports for task in tasks]
+
+    def iter_tasks(self, filter_=None, *, fields=None):
+        """Yield the tasks matching a filter one at a time, as taskwarrior exports them.
+
+        Accepts the same filters and `fields` as `load_tasks_and_filter`.  Contrary to the other
+        methods, the output of ``task export`` is parsed as it comes, so that memory use
+        doesn't depend on the number of tasks.  Stopping the iteration early, e.g., by
+        breaking out of a loop over it, kills taskwarrior.
+
+            for task in w.iter_tasks({"status": "completed"}):
+                ...
+        """
+        # Whatever the command, it should see the changes made so far.
+        self.flush()
+
+        query_args = self._encode_filter(filter_)
+        command, env = self._get_command(
+            [query_args, "export"] if query_args else ["export"],
+            # One task per line, rather than a single JSON array.
+            overrides={"json": {"array": "off"}},
+        )
+
+        # Nothing reads stderr before stdout is exhausted; a pipe could fill up, blocking
+        # taskwarrior for good.
+        stderr_file = tempfile.TemporaryFile()
+        try:
+            proc = subprocess.Popen(
+                command,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                **self._spawn_kwargs,
+            )
+        except FileNotFoundError:
+            stderr_file.close()
+            raise FileNotFoundError("Unable to find the 'task' command-line tool.")
+
+        try:
+            for line in proc.stdout:
+                # Some versions separate tasks with commas even when not in an array.
+                line = line.strip().rstrip(b",")
+                if line:
+                    task = self._parse_json(taskw_ng.utils.clean_output(line))
+                    if fields is not None:
+                        task = {key: task[key] for key in fields if key in task}
+                    yield self._get_task_object(task)
+            proc.wait()
+            stderr_file.seek(0)
+            self._check_output(command, proc.returncode, b"", stderr_file.read())
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            stderr_file.close()
+
+    def load_table(self, filter_=None, *, fields=None, use_numpy=True):
+        """Return the tasks matching a filter as a columnar `TaskTable`, for analytics.
+
+        Accepts the same filters and `fields` as `load_tasks_and_filter`, but tasks of
+        every status match by default.  The marshal setting doesn't apply.
+
+            table = w.load_table(fields=["status", "project", "due"])
+            table.filter({"status": "pending", "due.before": datetime.now()})
+        """
+        query_args = self._encode_filter(filter_)
+        stdout, _ = self._execute(
+            *([query_args, "export"] if query_args else ["export"]), raw=True
+        )
+        return TaskTable.from_export(
+            taskw_ng.utils.iter_json_array(self._decode(stdout)),
+            udas=self.config.get_schema(),
+            fields=fields,
+            use_numpy=use_numpy,
+        )
 
     def get_task(self, **kw):
         task = dict()
@@ -417,6 +866,16 @@ class TaskWarrior(TaskWarriorBase):
         if len(kwargs) > 1:
             raise KeyError("Only one keyword argument may be specified")
 
+        if self._write_buffer is not None and "uuid" in kwargs:
+            changes = self._write_buffer.get(kwargs["uuid"])
+            if changes is not None:
+                return self._load_buffered_task(kwargs["uuid"], changes)
+
+        task = self._get_task_objects(*(self._get_search_args(**kwargs) + ["export"]))
+        return self._first_task(task)
+
+    def _get_search_args(self, **kwargs):
+        """Return the filter selecting the task `get_task` is asked for."""
         search = []
         for key, value in kwargs.items():
             if key not in ["id", "uuid", "description"]:
@@ -431,9 +890,10 @@ class TaskWarrior(TaskWarriorBase):
                 search.append(value[4:])
             else:
                 search = [value]
+        return search
 
-        task = self._get_task_objects(*(search + ["export"]))
-
+    def _first_task(self, task):
+        """Return the ID and the first of the tasks matched by `_get_search_args`."""
         if task:
             if isinstance(task, list):
                 # Multiple items returned from search, return just the 1st
@@ -442,11 +902,53 @@ class TaskWarrior(TaskWarriorBase):
 
         return None, dict()
 
-    def task_add(self, description, tags=None, **kw):
+    def _load_buffered_task(self, task_uuid, changes):
+        """Load a task as it will be once its pending changes are written."""
+        with self._write_buffer.paused():
+            original_tasks = self._get_tasks_by_uuids([task_uuid], raw=True)
+        if not original_tasks:
+            return None, dict()
+
+        original_task = original_tasks[0]
+        task = self._merge_task_changes(original_task, changes)
+        # Not part of what gets written, but still expected when reading a task.
+        for key in ("id", "urgency"):
+            if key in original_task:
+                task[key] = original_task[key]
+        return task.get("id"), self._get_task_object(task)
+
+    def task_add(self, description, tags=None, *, refetch=None, **kw):
         """Add a new task.
 
         Takes any of the keywords allowed by taskwarrior like proj or prior.
         """
+        if self._batch is not None:
+            task, json_task = self._prepare_new_task(
+                dict(kw, description=description, tags=tags)
+            )
+            self._batch.add(json_task)
+            return task
+
+        task, annotations, args = self._prepare_task_add(description, tags, **kw)
+        stdout, stderr = self._execute("add", *args)
+        task["uuid"] = self._parse_added_uuid(task, stdout, stderr)
+
+        for annotation in annotations:
+            self.task_annotate(task, annotation, refetch=False)
+
+        if not self._should_refetch(refetch):
+            return self._patch_added_task(task, task["uuid"], annotations)
+
+        id, added_task = self.get_task(uuid=task["uuid"])
+        self._check_added_task(added_task, stdout, stderr)
+        return added_task
+
+    def _prepare_task_add(self, description, tags=None, **kw):
+        """Stub out a task to add.
+
+        Returns the task, the annotations to add once the task is created, and the
+        arguments to pass to ``task add``.
+        """
         task = self._stub_task(description, tags, **kw)
 
         # Check if there are annotations, if so remove them from the
@@ -455,7 +957,7 @@ class TaskWarrior(TaskWarriorBase):
 
         # With older versions of taskwarrior, you can specify whatever uuid you
         # want when adding a task.
-        if self.get_version() < version.parse("2.4"):
+        if self.get_version() < taskw_ng.utils.parse_version("2.4"):
             task["uuid"] = str(uuid.uuid4())
         elif "uuid" in task:
             del task["uuid"]
@@ -465,16 +967,27 @@ class TaskWarrior(TaskWarriorBase):
         else:
             args = taskw_ng.utils.encode_task_experimental(task)
 
-        stdout, stderr = self._execute("add", *args)
+        return task, annotations, args
 
+    def _parse_added_uuid(self, task, stdout, stderr):
+        """Return the UUID of a task ``task add`` just created."""
         # However, in 2.4 and later, you cannot specify whatever uuid you want
         # when adding a task.  Instead, you have to specify rc.verbose=new-uuid
         # and then parse the assigned uuid out from stdout.
-        if self.get_version() >= version.parse("2.4"):
-            task["uuid"] = re.search(UUID_REGEX, stdout).group(0)
-
-        _, added_task = self.get_task(uuid=task["uuid"])
+        if self.get_version() >= taskw_ng.utils.parse_version("2.4"):
+            match = re.search(UUID_REGEX, stdout)
+            if match is None:
+                raise KeyError(
+                    "Error encountered while creating task;STDOUT: %s; STDERR: %s"
+                    % (
+                        stdout,
+                        stderr,
+                    )
+                )
+            return match.group(0)
+        return task["uuid"]
 
+    def _check_added_task(self, added_task, stdout, stderr):
         # Check if 'uuid' is in the task we just added.
         if not "uuid" in added_task:
             raise KeyError(
@@ -485,53 +998,355 @@ class TaskWarrior(TaskWarriorBase):
                 )
             )
 
-        if annotations and "uuid" in added_task:
-            for annotation in annotations:
-                self.task_annotate(added_task, annotation)
+    def _patch_added_task(self, task, task_uuid, annotations):
+        """Give a stubbed out task the attributes taskwarrior assigned it when adding it."""
+        task["uuid"] = uuid.UUID(task_uuid) if self._marshal else task_uuid
+        if annotations:
+            task["annotations"] = annotations
+        return task
+
+    def task_add_many(self, stubs, *, refetch=None):
+        """Add many tasks at once.
 
-        id, added_task = self.get_task(uuid=added_task["uuid"])
-        return added_task
+        Takes an iterable of dicts, each holding the arguments of a single `task_add` call
+        (i.e., a ``description`` plus any other attributes), and creates all of them with
+        a single ``task import``.  Dates must be given as datetimes or in a format that
+        ``task import`` understands.
+
+        Returns the created tasks, in the same order as `stubs`.
+        """
+        prepared = [self._prepare_new_task(stub) for stub in stubs]
+
+        if self._batch is not None:
+            for _, json_task in prepared:
+                self._batch.add(json_task)
+            return [task for task, _ in prepared]
+
+        self._import_tasks([json_task for _, json_task in prepared])
+
+        if not self._should_refetch(refetch):
+            return [task for task, _ in prepared]
+        return self._get_tasks_by_uuids([json_task["uuid"] for _, json_task in prepared])
+
+    def _prepare_new_task(self, stub):
+        """Stub out a task meant to be created through ``task import``.
+
+        Returns the task as `task_add` returns it with refetch off, along with the
+        version of it to import.
+        """
+        task = self._stub_task(**stub)
+        annotations = self._extract_annotations_from_task(task)
+
+        # Contrary to `task add`, `task import` lets us pick the UUID ourselves.
+        task = self._patch_added_task(task, str(uuid.uuid4()), None)
+
+        json_task = taskw_ng.utils.encode_task_json(
+            task.serialized() if self._marshal else task
+        )
+        if annotations:
+            json_task["annotations"] = taskw_ng.utils.encode_annotations_json(annotations)
+
+        return self._patch_added_task(task, json_task["uuid"], annotations), json_task
+
+    def _merge_task_changes(self, original, changes):
+        """Apply a dict of (serialized) changes on top of a task as exported by taskwarrior.
+
+        Returns the resulting task, ready to be passed to `_import_tasks`.  Its
+        ``modified`` date is only bumped if the changes actually change something.
+        """
+        merged = dict(original)
+        for key, value in changes.items():
+            if key in ("id", "uuid", "urgency", "modified"):
+                continue
+            if key == "annotations":
+                value = taskw_ng.utils.encode_annotations_json(
+                    value or [], original=original.get("annotations", [])
+                )
+            if value is None or value == "" or value == []:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+
+        merged = taskw_ng.utils.encode_task_json(merged)
+        if merged != taskw_ng.utils.encode_task_json(original):
+            merged["modified"] = taskw_ng.utils.encode_task_value(
+                "modified", datetime.datetime.now(datetime.timezone.utc)
+            )
+        return merged
+
+    def task_update_many(self, tasks, *, refetch=None):
+        """Update many tasks at once.
+
+        Takes an iterable of tasks, either `Task` instances, of which only the recorded
+        changes are applied, or plain dicts, of which every given key is applied.  Keys
+        that are missing from a dict are left untouched, while keys set to ``None`` are
+        removed from the task.  Every task must have a UUID.
+
+        The current state of the tasks is fetched with a single export, merged with the
+        changes and written back with a single ``task import``.  Tasks the changes leave
+        as they are aren't written back.
+
+        Returns the updated tasks, in the same order as `tasks`.
+        """
+        changes = {}
+        for task in tasks:
+            if "uuid" not in task:
+                raise KeyError("Task must have a UUID.")
+            changes.setdefault(str(task["uuid"]), []).append(self._get_task_changes(task))
+
+        if self._batch is not None:
+            for task_uuid, task_changes in changes.items():
+                for change in task_changes:
+                    self._batch.update(task_uuid, change)
+            return [self._patch_updated_task(task) for task in tasks]
+
+        unchanged = set()
+        merged_tasks = self._prepare_updated_tasks(changes, unchanged=unchanged)
+        self._import_tasks([task for task in merged_tasks if task["uuid"] not in unchanged])
+
+        if not self._should_refetch(refetch):
+            return self._get_task_object_list(merged_tasks)
+        return self._get_tasks_by_uuids(changes.keys())
+
+    def _get_task_changes(self, task):
+        """Return the changes `task_update` would apply to a task, as a dict."""
+        if isinstance(task, Task):
+            return task.serialized_changes(keep=True)
+        return dict(task)
+
+    def _prepare_updated_tasks(self, changes, tasks=None, unchanged=None):
+        """Apply changes to tasks, fetching the current state of the ones not in `tasks`.
+
+        Takes a dict of UUIDs to lists of changes and, optionally, a dict of UUIDs to
+        tasks (as exported by taskwarrior) that don't need to be fetched.  Returns the
+        resulting tasks, ready to be passed to `_import_tasks`.  The UUIDs of the tasks
+        left as they were are added to the `unchanged` set, if given.
+        """
+        tasks = dict(tasks or {})
+        to_fetch = [task_uuid for task_uuid in changes if task_uuid not in tasks]
+        for original in self._get_tasks_by_uuids(to_fetch, raw=True):
+            tasks[original["uuid"]] = original
+
+        missing = [task_uuid for task_uuid in changes if task_uuid not in tasks]
+        if missing:
+            raise KeyError("No such task(s): %s" % ", ".join(missing))
+
+        merged_tasks = []
+        for task_uuid, task_changes in changes.items():
+            merged = tasks[task_uuid]
+            for change in task_changes:
+                merged = self._merge_task_changes(merged, change)
+            if unchanged is not None and merged == taskw_ng.utils.encode_task_json(
+                tasks[task_uuid]
+            ):
+                unchanged.add(task_uuid)
+            merged_tasks.append(merged)
+        return merged_tasks
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Group task operations into a single unit of work.
+
+        Within the block, `task_add`, `task_add_many`, `task_update`,
+        `task_update_many`, `task_done`, `tasks_done`, `task_delete` and `tasks_delete`
+        only record what they should do, returning what they would with refetch off.
+        Other methods run immediately and, in particular, reads don't see the recorded
+        operations.
+
+        On exit, the recorded operations are written with as few ``task import`` and
+        multi-UUID commands as possible.  If that fails, whatever was written is
+        reverted using taskwarrior's undo log, running ``task undo`` once per transaction
+        written -- e.g., once per imported task.  Should reverting fail too, that is
+        logged, and the error that made the batch fail is raised.  If the block raises,
+        nothing is written.  Nested batches are part of the outermost one.
+
+            with w.batch():
+                task = w.task_add("Eat food")
+                w.task_done(uuid=task["uuid"])
+        """
+        if self._batch is not None:
+            yield self._batch
+            return
+
+        self._batch = Batch()
+        try:
+            yield self._batch
+        except BaseException:
+            self._batch = None
+            raise
+
+        batch, self._batch = self._batch, None
+        self._commit_batch(batch)
 
-    def task_annotate(self, task, annotation):
+    def _commit_batch(self, batch):
+        """Write the operations recorded in a batch, reverting them on failure."""
+        undo_log_size = self._get_undo_log_size()
+        try:
+            unchanged = set()
+            updated_tasks = self._prepare_updated_tasks(
+                batch.updated,
+                tasks=dict(
+                    (task_uuid, task)
+                    for task_uuid, task in batch.added.items()
+                    if task_uuid in batch.updated
+                ),
+                unchanged=unchanged,
+            )
+            self._import_tasks(
+                [
+                    task
+                    for task_uuid, task in batch.added.items()
+                    if task_uuid not in batch.updated
+                ]
+                + [
+                    task
+                    for task in updated_tasks
+                    if task["uuid"] not in unchanged or task["uuid"] in batch.added
+                ]
+            )
+            if batch.done:
+                self._execute_on_uuids(batch.done, "done", refetch=False)
+            if batch.deleted:
+                self._execute_on_uuids(batch.deleted, "delete", refetch=False)
+        except Exception:
+            try:
+                self._undo_since(undo_log_size)
+            except Exception:
+                logger.exception("Cannot revert the failed batch")
+            raise
+
+    def _get_data_location(self):
+        """Return the directory taskwarrior stores its data in."""
+        data_location = self.config_overrides.get("data.location")
+        if data_location is None:
+            data_location = self.config_overrides.get("data", {}).get("location")
+        if data_location is None:
+            data_location = os.getenv("TASKDATA")
+        if data_location is None:
+            data_location = self.config.get("data", {}).get("location", "~/.task")
+        return os.path.expanduser(data_location)
+
+    def _get_undo_log_path(self):
+        return os.path.join(self._get_data_location(), "undo.data")
+
+    def _get_undo_log_size(self):
+        try:
+            return os.path.getsize(self._get_undo_log_path())
+        except OSError:
+            return 0
+
+    def _undo_since(self, undo_log_size):
+        """Revert every change recorded in the undo log after the given offset.
+
+        Runs ``task undo`` once per transaction to revert.
+        """
+        try:
+            with open(self._get_undo_log_path(), "rb") as undo_log:
+                undo_log.seek(undo_log_size)
+                transactions = sum(1 for line in undo_log if line.strip() == b"---")
+        except OSError:
+            logger.warning("Cannot find taskwarrior's undo log; changes were not reverted")
+            return
+
+        for undone in range(transactions):
+            try:
+                self._execute("undo")
+            except Exception:
+                logger.error(
+                    "Only %d of the %d transactions to revert were reverted",
+                    undone,
+                    transactions,
+                )
+                raise
+
+    def task_annotate(self, task, annotation, *, refetch=None):
         """Annotates a task."""
         self._execute(task["uuid"], "annotate", "--", annotation)
-        id, annotated_task = self.get_task(uuid=task["uuid"])
-        return annotated_task
+        return self._refetch_task(task["uuid"], refetch)
 
-    def task_denotate(self, task, annotation):
+    def task_denotate(self, task, annotation, *, refetch=None):
         """Removes an annotation from a task."""
         self._execute(task["uuid"], "denotate", "--", annotation)
-        id, denotated_task = self.get_task(uuid=task["uuid"])
-        return denotated_task
+        return self._refetch_task(task["uuid"], refetch)
 
-    def task_done(self, **kw):
+    def task_done(self, *, refetch=None, **kw):
         if not kw:
             raise KeyError("No key was passed.")
 
+        if self._batch is not None and list(kw) == ["uuid"]:
+            self._batch.mark_done(kw["uuid"])
+            return str(kw["uuid"])
+
+        if not self._should_refetch(refetch) and list(kw) == ["uuid"]:
+            self._execute(kw["uuid"], "done")
+            return str(kw["uuid"])
+
         id, task = self.get_task(**kw)
 
         if not Status.is_pending(task["status"]):
             raise ValueError("Task is not pending.")
 
-        self._execute(id, "done")
-        return self.get_task(uuid=task["uuid"])[1]
+        if self._batch is not None:
+            self._batch.mark_done(task["uuid"])
+            return str(task["uuid"])
 
-    def task_update(self, task):
+        self._execute(task["uuid"], "done")
+        return self._refetch_task(task["uuid"], refetch)
+
+    def task_update(self, task, *, refetch=None):
         if "uuid" not in task:
             raise KeyError("Task must have a UUID.")
+        input_task = task
+
+        if self._batch is not None:
+            self._batch.update(task["uuid"], self._get_task_changes(task))
+            return task.get("id"), self._patch_updated_task(input_task)
+
+        if self._write_buffer is not None:
+            self._write_buffer.add(task["uuid"], self._get_task_changes(task))
+            return task.get("id"), self._patch_updated_task(input_task)
+
+        task_uuid = str(task["uuid"])
+
+        # Fetch the task as exported, so that annotations keep their entry dates.
+        original_tasks = self._get_tasks_by_uuids([task_uuid], raw=True)
+        if not original_tasks:
+            raise KeyError("No such task: %s" % task_uuid)
+
+        id, task_to_import, modification = self._plan_task_update(task, original_tasks[0])
+
+        # Write all the annotation differences at once, by importing the original task
+        # with its complete, updated list of annotations.  This has to happen before
+        # `modify`, since importing replaces the whole task.
+        if task_to_import is not None:
+            self._import_tasks([task_to_import])
+
+        # Only try to modify the task if there are changes to post here
+        # (changes *might* just be in annotations).
+        if modification:
+            self._execute(task_uuid, "modify", *modification)
+
+        if not self._should_refetch(refetch):
+            return id, self._patch_updated_task(input_task)
+        return self.get_task(uuid=task_uuid)
+
+    def _plan_task_update(self, task, original_task):
+        """Work out how to turn `original_task`, as exported, into `task`.
+
+        Returns the ID to give back for the task, the task to import in order to update
+        its annotations (or None if they haven't changed), and the arguments to pass to
+        ``task modify`` (possibly none).
+        """
         # 'Legacy' causes us to handle this task as if it were an
         # old-style task -- just a standard dictionary
         legacy = True
-
         if isinstance(task, Task):
             # Let's pre-serialize taskw_ng.task.Task instances
-            task_uuid = str(task["uuid"])
             task = task.serialized_changes(keep=True)
             legacy = False
-        else:
-            task_uuid = task["uuid"]
 
-        id, original_task = self.get_task(uuid=task_uuid)
+        # The ID going back only makes sense if the task is pending.
+        id = original_task.get("id") if Status.is_pending(original_task["status"]) else None
 
         if "id" in task:
             del task["id"]
@@ -554,7 +1369,7 @@ class TaskWarrior(TaskWarriorBase):
                 self._extract_annotations_from_task(task_to_modify)
             )
             original_annotations = taskw_ng.utils.annotation_list_to_comparison_map(
-                self._extract_annotations_from_task(original_task)
+                self._extract_annotations_from_task(dict(original_task))
             )
 
             new_annotations = set(ttm_annotations.keys())
@@ -566,48 +1381,119 @@ class TaskWarrior(TaskWarriorBase):
             if "annotations" in task_to_modify:
                 del task_to_modify["annotations"]
 
-        modification = taskw_ng.utils.encode_task_experimental(task_to_modify)
-        # Only try to modify the task if there are changes to post here
-        # (changes *might* just be in annotations).
-        if modification:
-            self._execute(task_uuid, "modify", *modification)
+        task_to_import = None
+        if annotations_to_delete or annotations_to_create:
+            annotations = [
+                annotation
+                for annotation in original_task.get("annotations", [])
+                if taskw_ng.utils.make_annotation_comparable(annotation["description"])
+                not in annotations_to_delete
+            ] + [v for k, v in ttm_annotations.items() if k in annotations_to_create]
+            task_to_import = self._merge_task_changes(
+                original_task, {"annotations": annotations}
+            )
 
-        # If there are no existing annotations, add the new ones
-        if legacy or annotations_to_delete or annotations_to_create:
-            ttm_annotations.update(original_annotations)
-            for annotation_key in annotations_to_create:
-                self.task_annotate(original_task, ttm_annotations[annotation_key])
-            for annotation_key in annotations_to_delete:
-                self.task_denotate(original_task, ttm_annotations[annotation_key])
+        if legacy:
+            # Old-style tasks hold every field, not just the changed ones; only send
+            # the latter to taskwarrior.
+            task_to_modify = taskw_ng.utils.diff_task_fields(original_task, task_to_modify)
 
-        return self.get_task(uuid=task_uuid)
+        return id, task_to_import, taskw_ng.utils.encode_task_experimental(task_to_modify)
 
-    def task_delete(self, **kw):
+    def _patch_updated_task(self, task):
+        """Return the given task as it is expected to be after `task_update`."""
+        if isinstance(task, Task):
+            return task
+        return dict((k, v) for k, v in task.items() if v is not None and v != "")
+
+    def task_delete(self, *, refetch=None, **kw):
         """Marks a task as deleted."""
 
+        if self._batch is not None and list(kw) == ["uuid"]:
+            self._batch.mark_deleted(kw["uuid"])
+            return str(kw["uuid"])
+
+        if not self._should_refetch(refetch) and list(kw) == ["uuid"]:
+            self._execute(kw["uuid"], "delete")
+            return str(kw["uuid"])
+
         id, task = self.get_task(**kw)
 
         if task["status"] == Status.DELETED:
             raise ValueError("Task is already deleted.")
 
+        if self._batch is not None:
+            self._batch.mark_deleted(task["uuid"])
+            return str(task["uuid"])
+
         self._execute(task["uuid"], "delete")
-        return self.get_task(uuid=task["uuid"])[1]
+        return self._refetch_task(task["uuid"], refetch)
 
-    def task_start(self, **kw):
+    def task_start(self, *, refetch=None, **kw):
         """Marks a task as started."""
 
+        if not self._should_refetch(refetch) and list(kw) == ["uuid"]:
+            self._execute(kw["uuid"], "start")
+            return str(kw["uuid"])
+
         id, task = self.get_task(**kw)
 
-        self._execute(id, "start")
-        return self.get_task(uuid=task["uuid"])[1]
+        self._execute(task["uuid"], "start")
+        return self._refetch_task(task["uuid"], refetch)
 
-    def task_stop(self, **kw):
+    def task_stop(self, *, refetch=None, **kw):
         """Marks a task as stopped."""
 
+        if not self._should_refetch(refetch) and list(kw) == ["uuid"]:
+            self._execute(kw["uuid"], "stop")
+            return str(kw["uuid"])
+
         id, task = self.get_task(**kw)
 
-        self._execute(id, "stop")
-        return self.get_task(uuid=task["uuid"])[1]
+        self._execute(task["uuid"], "stop")
+        return self._refetch_task(task["uuid"], refetch)
+
+    def tasks_done(self, uuids, *, refetch=None):
+        """Marks many tasks as done.
+
+        Raises a `TaskwarriorError` if any of the tasks is not pending; the rest of the
+        tasks are still marked as done.
+        """
+        if self._batch is not None:
+            uuids = [str(task_uuid) for task_uuid in uuids]
+            for task_uuid in uuids:
+                self._batch.mark_done(task_uuid)
+            return uuids
+        return self._execute_on_uuids(uuids, "done", refetch=refetch)
+
+    def tasks_delete(self, uuids, *, refetch=None):
+        """Marks many tasks as deleted.
+
+        Raises a `TaskwarriorError` if any of the tasks is already deleted; the rest of
+        the tasks are still marked as deleted.
+        """
+        if self._batch is not None:
+            uuids = [str(task_uuid) for task_uuid in uuids]
+            for task_uuid in uuids:
+                self._batch.mark_deleted(task_uuid)
+            return uuids
+        return self._execute_on_uuids(uuids, "delete", refetch=refetch)
+
+    def tasks_start(self, uuids, *, refetch=None):
+        """Marks many tasks as started."""
+        return self._execute_on_uuids(uuids, "start", refetch=refetch)
+
+    def tasks_stop(self, uuids, *, refetch=None):
+        """Marks many tasks as stopped."""
+        return self._execute_on_uuids(uuids, "stop", refetch=refetch)
+
+    def tasks_annotate(self, uuids, annotation, *, refetch=None):
+        """Adds the same annotation to many tasks."""
+        return self._execute_on_uuids(uuids, "annotate", "--", annotation, refetch=refetch)
+
+    def tasks_denotate(self, uuids, annotation, *, refetch=None):
+        """Removes the same annotation from many tasks."""
+        return self._execute_on_uuids(uuids, "denotate", "--", annotation, refetch=refetch)
 
     def task_info(self, **kw):
         id, task = self.get_task(**kw)
@@ -617,6 +1503,40 @@ class TaskWarrior(TaskWarriorBase):
         return out
 
 
+def _read_version_cache(filename):
+    if filename is None:
+        return {}
+    try:
+        with open(os.path.expanduser(filename)) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_version_cache(filename, cache):
+    if filename is None:
+        return
+    filename = os.path.expanduser(filename)
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # Write to a temporary file first, so that concurrent readers never see a
+        # partially written cache.
+        temporary_filename = "%s.%d" % (filename, os.getpid())
+        with open(temporary_filename, "w") as f:
+            json.dump(cache, f)
+        os.replace(temporary_filename, filename)
+    except OSError:
+        logger.debug("Cannot write the taskwarrior version cache to %s", filename)
+
+
+def _flush_write_buffer(write_buffer_ref):
+    """Write any pending changes before the interpreter exits."""
+    write_buffer = write_buffer_ref()
+    if write_buffer is not None:
+        write_buffer.flush()
+
+
 class DataFile(object):
     """Encapsulates data file names."""
 
@@ -678,7 +1598,3 @@ class Status(object):
 
 class UnsupportedVersionException(BaseException):
     pass
-
-
-if not TaskWarrior.can_use():
-    raise UnsupportedVersionException()
@@ -0,0 +1,222 @@
+"""Serialization of the commands writing to a taskwarrior database.
+
+See `TaskWarrior(write_queue=True)`.
+"""
+import os
+import threading
+import time
+import uuid
+import weakref
+
+# Commands changing tasks, the other ones being reads.  When in doubt, a command is
+# considered a write since serializing a read is harmless.
+WRITE_COMMANDS = frozenset(
+    [
+        "add",
+        "annotate",
+        "append",
+        "delete",
+        "denotate",
+        "done",
+        "duplicate",
+        "import",
+        "log",
+        "modify",
+        "prepend",
+        "purge",
+        "start",
+        "stop",
+        "sync",
+        "undo",
+    ]
+)
+
+# Commands that can be given the UUIDs of many tasks at once, and nothing else.
+MULTI_UUID_COMMANDS = frozenset(["delete", "done", "start", "stop"])
+
+_write_queues = weakref.WeakValueDictionary()
+_write_queues_lock = threading.Lock()
+
+
+def is_write(args):
+    """Tell whether a taskwarrior command might change tasks.
+
+    >>> is_write(["status:pending", "export"])
+    False
+    >>> is_write(["7a4d6c3a-7b8a-4b1e-9d3a-2f4f0a0b5c11", "done"])
+    True
+    """
+    return any(str(arg) in WRITE_COMMANDS for arg in args)
+
+
+def get_write_queue(data_location):
+    """Return the queue shared by every client writing to the given data location."""
+    key = os.path.realpath(os.path.expanduser(data_location))
+    with _write_queues_lock:
+        write_queue = _write_queues.get(key)
+        if write_queue is None:
+            write_queue = _write_queues[key] = WriteQueue()
+        return write_queue
+
+
+def _is_uuid(arg):
+    try:
+        uuid.UUID(str(arg))
+    except ValueError:
+        return False
+    return True
+
+
+class _Write(object):
+    def __init__(self, client, args, stdin):
+        self.client = client
+        self.args = [str(arg) for arg in args]
+        self.stdin = stdin
+        self.submitted = time.monotonic()
+        self.done = False
+        self.result = None
+        self.error = None
+
+    @property
+    def merge_key(self):
+        """What a write can be merged with, or None if it has to run on its own."""
+        if self.args == ["import"] and self.stdin is not None:
+            return (id(self.client), "import")
+        command = self.args[-1]
+        if command in MULTI_UUID_COMMANDS and all(_is_uuid(arg) for arg in self.args[:-1]):
+            return (id(self.client), command)
+        return None
+
+
+class WriteQueue(object):
+    """Runs the writes of many threads one at a time.
+
+    Writes are queued and executed by whichever waiting thread gets to run them,
+    so that no two writes fight over taskwarrior's lock.  Queued writes that can be
+    expressed as a single command -- imports, or completing, deleting, starting or
+    stopping tasks by UUID -- are merged.  If a merged command fails, the writes it was
+    made of are run again one at a time, so that each fails or succeeds on its own.
+
+    Reads don't go through the queue, and thus run concurrently with writes.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._running = False
+        self._condition = threading.Condition()
+        self._writes = 0
+        self._commands = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def depth(self):
+        """The number of writes waiting to be executed."""
+        return len(self._pending)
+
+    def stats(self):
+        """Return counters describing the contention on the queue.
+
+        * ``depth``: number of writes currently waiting,
+        * ``writes``: number of writes executed so far,
+        * ``commands``: number of taskwarrior commands they were merged into,
+        * ``total_wait`` and ``max_wait``: time, in seconds, writes spent in the queue.
+        """
+        with self._condition:
+            return {
+                "depth": len(self._pending),
+                "writes": self._writes,
+                "commands": self._commands,
+                "total_wait": self._total_wait,
+                "max_wait": self._max_wait,
+            }
+
+    def submit(self, client, args, stdin=None):
+        """Queue a write and wait for it to be executed by ``client._run``.
+
+        Returns what ``client._run`` returned for it.
+        """
+        write = _Write(client, args, stdin)
+        with self._condition:
+            self._pending.append(write)
+            while not write.done and self._running:
+                self._condition.wait()
+            if not write.done:
+                self._running = True
+
+        if not write.done:
+            try:
+                while not write.done:
+                    self._run_next()
+            finally:
+                with self._condition:
+                    self._running = False
+                    self._condition.notify_all()
+
+        if write.error is not None:
+            raise write.error
+        return write.result
+
+    def _run_next(self):
+        with self._condition:
+            first = self._pending.pop(0)
+            group = [first]
+            key = first.merge_key
+            if key is not None:
+                max_length = first.client._get_max_args_length()
+                length = sum(len(arg) + 1 for arg in first.args)
+                for write in list(self._pending):
+                    if write.merge_key != key:
+                        continue
+                    if key[1] != "import":
+                        length += sum(len(arg) + 1 for arg in write.args[:-1])
+                        if length > max_length:
+                            break
+                    self._pending.remove(write)
+                    group.append(write)
+
+            started = time.monotonic()
+            for write in group:
+                wait = started - write.submitted
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            self._writes += len(group)
+            self._commands += 1
+
+        if key is None:
+            args, stdin = first.args, first.stdin
+        elif key[1] == "import":
+            args, stdin = ["import"], "\n".join(write.stdin for write in group)
+        else:
+            args = [arg for write in group for arg in write.args[:-1]] + [key[1]]
+            stdin = None
+
+        outcomes = [self._run(first.client, args, stdin)] * len(group)
+        if len(group) > 1 and isinstance(outcomes[0][1], Exception):
+            # Don't fail every write for the sake of one; find out which did.
+            outcomes = []
+            for write in group:
+                outcomes.append(self._run(write.client, write.args, write.stdin))
+                if not isinstance(outcomes[-1][1], (Exception, type(None))):
+                    break
+            with self._condition:
+                self._commands += len(outcomes)
+            # Writes left after an interruption fail with it.
+            outcomes += [outcomes[-1]] * (len(group) - len(outcomes))
+
+        with self._condition:
+            for write, (result, error) in zip(group, outcomes):
+                write.result, write.error, write.done = result, error, True
+            self._condition.notify_all()
+
+        # Let interruptions propagate from the thread that got them.
+        error = outcomes[-1][1]
+        if error is not None and not isinstance(error, Exception):
+            raise error
+
+    def _run(self, client, args, stdin):
+        """Run a command, returning its result and the exception it raised, if any."""
+        try:
+            return client._run(*args, stdin=stdin), None
+        except BaseException as e:
+            return None, e
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Iterator
+
+import pytest
+
+from taskw_ng.aio import AsyncTaskWarrior
+
+
+@pytest.fixture
+def tw() -> Iterator[AsyncTaskWarrior]:
+    # Create some temporary config stuff
+    _, fname = tempfile.mkstemp(prefix="taskw_ng-testsrc")
+    dname = tempfile.mkdtemp(prefix="taskw_ng-tests-data")
+
+    with open(fname, "w") as f:
+        f.writelines(
+            [
+                "data.location=%s\n" % dname,
+                "uda.somenumber.label=Testing Number\n",
+                "uda.somenumber.type=numeric\n",
+            ]
+        )
+
+    # Create empty .data files
+    for piece in ["completed", "pending", "undo"]:
+        with open(os.path.sep.join([dname, piece + ".data"]), "w"):
+            pass
+
+    yield AsyncTaskWarrior(config_filename=fname, max_concurrency=2)
+
+    # cleanup
+    os.remove(fname)
+    shutil.rmtree(dname)
+
+
+def run_python(tw: AsyncTaskWarrior, monkeypatch, code):
+    """Make `tw` run the given python code instead of taskwarrior."""
+    monkeypatch.setattr(
+        tw._client, "_get_command", lambda args: ([sys.executable, "-c", code], os.environ)
+    )
+
+
+def test_cancel_kills_process(tw: AsyncTaskWarrior, monkeypatch, tmpdir):
+    pid_file = tmpdir.join("pid")
+    run_python(
+        tw,
+        monkeypatch,
+        "import os, time; open(%r, 'w').write(str(os.getpid())); time.sleep(30)"
+        % str(pid_file),
+    )
+
+    async def cancel():
+        execution = asyncio.ensure_future(tw._execute("export"))
+        while not pid_file.exists() or not pid_file.read():
+            await asyncio.sleep(0.01)
+        execution.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await execution
+
+    started = time.monotonic()
+    asyncio.run(cancel())
+    assert time.monotonic() - started < 10
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read()), 0)
+
+
+def test_concurrency_is_bounded(tw: AsyncTaskWarrior, monkeypatch):
+    run_python(tw, monkeypatch, "import time; print(time.time()); time.sleep(0.3)")
+
+    async def run_all():
+        return await asyncio.gather(*(tw._execute("export") for _ in range(4)))
+
+    starts = sorted(float(stdout) for stdout, _ in asyncio.run(run_all()))
+    # Two by two
+    assert starts[1] - starts[0] < 0.25
+    assert starts[2] - starts[0] >= 0.25
+
+
+def test_add_update_done(tw: AsyncTaskWarrior):
+    async def run():
+        task = await tw.task_add("foobar", project="some_project", annotations=["one"])
+        task["priority"] = "H"
+        task["annotations"] = ["two"]
+        _, updated = await tw.task_update(task)
+        await tw.task_done(uuid=task["uuid"])
+        return updated, await tw.load_tasks()
+
+    updated, tasks = asyncio.run(run())
+
+    assert updated["priority"] == "H"
+    assert [a["description"] for a in updated["annotations"]] == ["two"]
+    assert len(tasks["pending"]) == 0
+    assert tasks["completed"][0]["project"] == "some_project"
+
+
+def test_filter_tasks_marshal(tw: AsyncTaskWarrior):
+    tw = AsyncTaskWarrior(config_filename=tw.config_filename, marshal=True)
+
+    async def run():
+        await tw.task_add("foobar", somenumber=15)
+        await tw.task_add("other")
+        return await tw.filter_tasks({"somenumber": 15})
+
+    (task,) = asyncio.run(run())
+    assert task["description"] == "foobar"
+    assert task["somenumber"] == 15
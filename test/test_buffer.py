@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from taskw_ng.buffer import WriteBuffer
+
+UUID1 = "c1c431ea-f0dc-4683-9a20-e64fcfa65fd1"
+UUID2 = "4882751a-3966-4439-9675-948b1152895c"
+
+
+@pytest.fixture
+def written():
+    return []
+
+
+@pytest.fixture
+def buffer(written) -> WriteBuffer:
+    return WriteBuffer(written.append, max_size=10, max_delay=None)
+
+
+def test_merges_changes_per_task(buffer: WriteBuffer, written):
+    buffer.add(UUID1, {"project": "foo"})
+    buffer.add(UUID1, {"tags": ["one"]})
+    buffer.add(UUID2, {"priority": "L"})
+    buffer.add(UUID1, {"project": "bar", "priority": "H"})
+
+    assert len(buffer) == 2
+    assert UUID1 in buffer
+    assert buffer.get(UUID1) == {"project": "bar", "tags": ["one"], "priority": "H"}
+    assert written == []
+
+    buffer.flush()
+
+    assert written == [
+        [
+            {"uuid": UUID1, "project": "bar", "tags": ["one"], "priority": "H"},
+            {"uuid": UUID2, "priority": "L"},
+        ]
+    ]
+    assert len(buffer) == 0
+    assert buffer.get(UUID1) is None
+
+
+def test_flush_without_changes(buffer: WriteBuffer, written):
+    buffer.flush()
+    assert written == []
+
+
+def test_flushes_on_size(buffer: WriteBuffer, written):
+    buffer.max_size = 2
+    buffer.add(UUID1, {"project": "foo"})
+    assert written == []
+    buffer.add(UUID2, {"project": "foo"})
+    assert len(written) == 1
+    assert len(buffer) == 0
+
+
+def test_flushes_on_delay(buffer: WriteBuffer, written):
+    buffer.max_delay = 0.01
+    buffer.add(UUID1, {"project": "foo"})
+
+    deadline = time.time() + 5
+    while not written and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert written == [[{"uuid": UUID1, "project": "foo"}]]
+
+
+def test_paused(buffer: WriteBuffer, written):
+    buffer.add(UUID1, {"project": "foo"})
+    with buffer.paused():
+        buffer.flush()
+    assert written == []
+    buffer.flush()
+    assert len(written) == 1
+
+
+def test_keeps_changes_on_failure():
+    def fail(tasks):
+        raise RuntimeError("Boom")
+
+    buffer = WriteBuffer(fail, max_delay=None)
+    buffer.add(UUID1, {"project": "foo"})
+
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+
+    assert buffer.get(UUID1) == {"project": "foo"}
@@ -0,0 +1,72 @@
+import datetime
+import uuid
+
+import pytest
+
+from taskw_ng.codec import Codec
+from taskw_ng.fields import ChoiceField, DateField, DurationField, NumericField, StringField
+from taskw_ng.task import Task
+
+UDAS = {
+    "estimate": NumericField(),
+    "remind": DateField(),
+    "length": DurationField(),
+    "size": ChoiceField(choices=["S", "M", "L"]),
+    "kind": ChoiceField(choices=[None, "Bug", "Feature"], case_sensitive=True),
+    "note": StringField(),
+}
+SCHEMA = Task.get_schema(UDAS)
+
+VALUES = [
+    None,
+    "",
+    0,
+    3,
+    "3",
+    "1.5",
+    2.5,
+    "abc",
+    "a [b] &open;c&close; &dquot;",
+    "m",
+    "Bug",
+    "bug",
+    "20230102T030405Z",
+    "PT90S",
+    "P1DT2H",
+    "d4b54c6d-b6a2-4173-8313-79086ef2af18",
+    uuid.UUID("d4b54c6d-b6a2-4173-8313-79086ef2af18"),
+    datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+    datetime.date(2023, 1, 2),
+    datetime.timedelta(minutes=3),
+    ["a", "b"],
+]
+
+
+def convert(function, value):
+    try:
+        return function(value)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("key", sorted(SCHEMA) + ["unknown"])
+def test_same_as_fields(key):
+    for value in VALUES:
+        assert convert(lambda v: SCHEMA.codec.serialize(key, v), value) == convert(
+            lambda v: Task._serialize(key, v, SCHEMA), value
+        ), value
+        assert convert(lambda v: SCHEMA.codec.deserialize(key, v), value) == convert(
+            lambda v: Task._deserialize(key, v, SCHEMA), value
+        ), value
+
+
+def test_skips_identity_fields():
+    assert "status" not in SCHEMA.codec.deserializers
+    assert "unknown" not in SCHEMA.codec.serializers
+    assert "status" in SCHEMA.codec.serializers
+
+
+def test_cached_per_schema():
+    assert SCHEMA.codec is Task.get_schema(SCHEMA).codec
+    assert isinstance(Task.get_schema().codec, Codec)
+    assert Task.get_schema().codec is not SCHEMA.codec
@@ -1,11 +1,18 @@
 import datetime
 import os
 import shutil
+import sys
 import tempfile
+import threading
+from unittest import mock
 
 import dateutil.tz
 import pytest
 
+from taskw_ng.dates import parse_date
+from taskw_ng.exceptions import TaskwarriorError
+from taskw_ng.record import TaskRecord
+from taskw_ng.task import LazyTask
 from taskw_ng.warrior import TaskWarrior
 
 TASK = {
@@ -630,3 +637,677 @@ def test_add_and_retrieve_uda_string_url_in_parens(tw: TaskWarrior):
     assert len(results) == 1
     task = results[0]
     assert task["someurl"] == arbitrary_url
+
+
+def test_add_many(tw: TaskWarrior):
+    added = tw.task_add_many(
+        [
+            {"description": "foobar1"},
+            {"description": "foobar2", "project": "some_project", "tags": ["one", "two"]},
+            {
+                "description": "foobar3",
+                "due": datetime.datetime(2011, 1, 1, tzinfo=datetime.timezone.utc),
+            },
+        ]
+    )
+    assert [task["description"] for task in added] == ["foobar1", "foobar2", "foobar3"]
+
+    tasks = tw.load_tasks()
+    assert len(tasks["pending"]) == 3
+    assert added[1]["project"] == "some_project"
+    assert added[1]["tags"] == ["one", "two"]
+    assert parse_date(added[2]["due"]) == datetime.datetime(
+        2011, 1, 1, tzinfo=datetime.timezone.utc
+    )
+
+
+def test_add_many_with_annotations(tw: TaskWarrior):
+    added = tw.task_add_many(
+        [{"description": "foobar", "annotations": ["first", "second", "third"]}]
+    )
+    assert len(added) == 1
+    assert [a["description"] for a in added[0]["annotations"]] == ["first", "second", "third"]
+
+
+def test_add_many_empty(tw: TaskWarrior):
+    assert tw.task_add_many([]) == []
+    assert len(tw.load_tasks()["pending"]) == 0
+
+
+def test_add_many_marshal(tw_marshal: TaskWarrior):
+    added = tw_marshal.task_add_many(
+        [
+            {"description": "foobar", "somenumber": 15},
+            {"description": "bazbar", "somedate": datetime.datetime(2011, 1, 1)},
+        ]
+    )
+    assert len(added) == 2
+    assert added[0]["somenumber"] == 15
+    assert added[1]["somedate"].year == 2011
+
+
+def test_update_many(tw: TaskWarrior):
+    tw.task_add_many([{"description": "foobar1"}, {"description": "foobar2"}])
+    tasks = tw.load_tasks()["pending"]
+
+    updated = tw.task_update_many(
+        [
+            {"uuid": tasks[0]["uuid"], "priority": "H"},
+            {"uuid": tasks[1]["uuid"], "project": "some_project"},
+        ]
+    )
+
+    assert [task["uuid"] for task in updated] == [task["uuid"] for task in tasks]
+    assert updated[0]["priority"] == "H"
+    assert updated[0]["description"] == tasks[0]["description"]
+    assert updated[1]["project"] == "some_project"
+
+
+def test_update_many_removes_none(tw: TaskWarrior):
+    task = tw.task_add("foobar", somestring="this is a uda")
+    (updated,) = tw.task_update_many([{"uuid": task["uuid"], "somestring": None}])
+    assert "somestring" not in updated
+
+
+def test_update_many_annotations(tw: TaskWarrior):
+    task = tw.task_add("foobar", annotations=["first"])
+    task["annotations"].append({"description": "second"})
+
+    (updated,) = tw.task_update_many([task])
+
+    assert [a["description"] for a in updated["annotations"]] == ["first", "second"]
+    assert updated["annotations"][0] == task["annotations"][0]
+
+
+def test_update_many_unknown_task(tw: TaskWarrior):
+    with pytest.raises(KeyError):
+        tw.task_update_many(
+            [{"uuid": "c1c431ea-f0dc-4683-9a20-e64fcfa65fd1", "priority": "H"}]
+        )
+
+
+def test_update_many_marshal(tw_marshal: TaskWarrior):
+    task = tw_marshal.task_add("foobar")
+    task["priority"] = "L"
+    task["somedate"] = datetime.datetime(2011, 1, 1, tzinfo=dateutil.tz.tzutc())
+
+    (updated,) = tw_marshal.task_update_many([task])
+
+    assert updated["priority"] == "L"
+    assert updated["somedate"] == task["somedate"]
+
+
+def test_update_many_unchanged(tw_marshal: TaskWarrior):
+    task = tw_marshal.task_add("foobar")
+    other = tw_marshal.task_add("bazbar")
+    undo_log_size = tw_marshal._get_undo_log_size()
+
+    updated = tw_marshal.task_update_many([task, {"uuid": other["uuid"]}])
+
+    assert [t["modified"] for t in updated] == [task["modified"], other["modified"]]
+    assert tw_marshal._get_undo_log_size() == undo_log_size
+
+
+def test_merge_task_changes_modified(tw: TaskWarrior):
+    original = {
+        "uuid": "c1c431ea-f0dc-4683-9a20-e64fcfa65fd1",
+        "description": "foobar",
+        "modified": "20110101T000000Z",
+    }
+
+    assert tw._merge_task_changes(original, {"description": "foobar"}) == original
+    merged = tw._merge_task_changes(original, {"description": "bazbar"})
+    assert merged["description"] == "bazbar"
+    assert merged["modified"] > original["modified"]
+
+
+def test_tasks_done(tw: TaskWarrior):
+    added = tw.task_add_many([{"description": "foobar%d" % i} for i in range(5)])
+    uuids = [task["uuid"] for task in added]
+
+    done = tw.tasks_done(uuids[:4])
+
+    assert [task["uuid"] for task in done] == uuids[:4]
+    assert all(task["status"] == "completed" for task in done)
+    tasks = tw.load_tasks()
+    assert len(tasks["pending"]) == 1
+    assert len(tasks["completed"]) == 4
+
+
+def test_tasks_done_chunked(tw: TaskWarrior):
+    tw.BULK_CHUNK_SIZE = 2
+    added = tw.task_add_many([{"description": "foobar%d" % i} for i in range(5)])
+
+    done = tw.tasks_done([task["uuid"] for task in added])
+
+    assert len(done) == 5
+    assert len(tw.load_tasks()["pending"]) == 0
+
+
+def test_tasks_delete(tw: TaskWarrior):
+    added = tw.task_add_many([{"description": "foobar1"}, {"description": "foobar2"}])
+
+    deleted = tw.tasks_delete([task["uuid"] for task in added])
+
+    assert all(task["status"] == "deleted" for task in deleted)
+    assert len(tw.load_tasks()["pending"]) == 0
+
+
+def test_tasks_start_stop(tw: TaskWarrior):
+    added = tw.task_add_many([{"description": "foobar1"}, {"description": "foobar2"}])
+    uuids = [task["uuid"] for task in added]
+
+    assert all("start" in task for task in tw.tasks_start(uuids))
+    assert all("start" not in task for task in tw.tasks_stop(uuids))
+
+
+def test_tasks_annotate_denotate(tw: TaskWarrior):
+    added = tw.task_add_many([{"description": "foobar1"}, {"description": "foobar2"}])
+    uuids = [task["uuid"] for task in added]
+
+    annotated = tw.tasks_annotate(uuids, "sprint 42")
+    assert all(
+        [a["description"] for a in task["annotations"]] == ["sprint 42"] for task in annotated
+    )
+
+    denotated = tw.tasks_denotate(uuids, "sprint 42")
+    assert all(not task.get("annotations") for task in denotated)
+
+
+def test_add_no_refetch(tw: TaskWarrior):
+    task = tw.task_add("foobar", project="some_project", refetch=False)
+    assert task["description"] == "foobar"
+    assert task["project"] == "some_project"
+
+    _, stored = tw.get_task(uuid=task["uuid"])
+    assert stored["description"] == "foobar"
+
+
+def test_add_no_refetch_client_wide(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, refetch=False)
+    task = tw.task_add("foobar", annotations=["first"])
+    assert task["annotations"] == ["first"]
+
+    _, stored = tw.get_task(uuid=task["uuid"])
+    assert [a["description"] for a in stored["annotations"]] == ["first"]
+
+    # Explicitly asking for the refetched task still works
+    assert tw.task_add("bazbar", refetch=True)["status"] == "pending"
+
+
+def test_done_no_refetch(tw: TaskWarrior):
+    task = tw.task_add("foobar")
+    assert tw.task_done(uuid=task["uuid"], refetch=False) == task["uuid"]
+    assert len(tw.load_tasks()["completed"]) == 1
+
+
+def test_start_stop_delete_no_refetch(tw: TaskWarrior):
+    task = tw.task_add("foobar")
+    assert tw.task_start(uuid=task["uuid"], refetch=False) == task["uuid"]
+    assert "start" in tw.get_task(uuid=task["uuid"])[1]
+    assert tw.task_stop(id=task["id"], refetch=False) == task["uuid"]
+    assert "start" not in tw.get_task(uuid=task["uuid"])[1]
+    assert tw.task_delete(uuid=task["uuid"], refetch=False) == task["uuid"]
+    assert len(tw.load_tasks()["pending"]) == 0
+
+
+def test_update_no_refetch(tw: TaskWarrior):
+    task = tw.task_add("foobar")
+    task["priority"] = "L"
+    _, updated = tw.task_update(task, refetch=False)
+    assert updated["priority"] == "L"
+    assert tw.get_task(uuid=task["uuid"])[1]["priority"] == "L"
+
+
+def test_update_no_refetch_marshal(tw_marshal: TaskWarrior):
+    task = tw_marshal.task_add("foobar")
+    task["priority"] = "L"
+    _, updated = tw_marshal.task_update(task, refetch=False)
+    assert updated is task
+    assert tw_marshal.get_task(uuid=task["uuid"])[1]["priority"] == "L"
+
+
+def test_bulk_no_refetch(tw: TaskWarrior):
+    added = tw.task_add_many(
+        [{"description": "foobar1"}, {"description": "foobar2"}], refetch=False
+    )
+    uuids = [task["uuid"] for task in added]
+    assert tw.tasks_done(uuids, refetch=False) == uuids
+    assert len(tw.load_tasks()["completed"]) == 2
+
+
+def test_update_adds_many_annotations(tw: TaskWarrior):
+    task = tw.task_add("foobar", annotations=["first"])
+    original_entry = task["annotations"][0]["entry"]
+    task["annotations"].extend(["comment %d" % i for i in range(50)])
+
+    _, task = tw.task_update(task)
+
+    assert len(task["annotations"]) == 51
+    assert task["annotations"][0]["entry"] == original_entry
+    assert len(set(a["entry"] for a in task["annotations"])) == 51
+
+
+def test_update_removes_annotations(tw: TaskWarrior):
+    task = tw.task_add("foobar", annotations=["first", "second", "third"])
+    task["annotations"] = [task["annotations"][1]]
+    task["priority"] = "H"
+
+    _, task = tw.task_update(task)
+
+    assert [a["description"] for a in task["annotations"]] == ["second"]
+    assert task["priority"] == "H"
+
+
+def test_update_sends_changed_fields_only(tw: TaskWarrior):
+    task = tw.task_add("foobar", project="some_project")
+
+    with mock.patch.object(tw, "_execute", wraps=tw._execute) as execute:
+        tw.task_update(task, refetch=False)
+        assert not any("modify" in call.args for call in execute.call_args_list)
+
+        task["priority"] = "H"
+        tw.task_update(task, refetch=False)
+        (modify_call,) = [call for call in execute.call_args_list if "modify" in call.args]
+        assert modify_call.args[2:] == ('priority:"H"',)
+
+    assert tw.get_task(uuid=task["uuid"])[1]["priority"] == "H"
+
+
+def test_write_buffer(empty_taskrc: str, monkeypatch):
+    monkeypatch.setattr(TaskWarrior, "WRITE_BUFFER_MAX_DELAY", None)
+    tw = TaskWarrior(config_filename=empty_taskrc, write_buffer=True)
+    task = tw.task_add("foobar")
+
+    with mock.patch.object(tw, "task_update_many", wraps=tw.task_update_many) as update_many:
+        task["project"] = "some_project"
+        tw.task_update(task)
+        task["tags"] = ["one"]
+        tw.task_update(task)
+        task["priority"] = "H"
+        _, returned = tw.task_update(task)
+        assert returned["priority"] == "H"
+
+        # Reads by UUID see the pending changes without writing them
+        _, pending = tw.get_task(uuid=task["uuid"])
+        assert pending["project"] == "some_project"
+        assert pending["priority"] == "H"
+        assert not update_many.called
+
+        tw.flush()
+        assert update_many.call_count == 1
+
+    _, stored = tw.get_task(uuid=task["uuid"])
+    assert stored["project"] == "some_project"
+    assert stored["tags"] == ["one"]
+    assert stored["priority"] == "H"
+
+
+def test_write_buffer_flushes_before_other_commands(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, write_buffer=True)
+    task = tw.task_add("foobar")
+    task["project"] = "some_project"
+    tw.task_update(task)
+
+    tasks = tw.filter_tasks({"project": "some_project"})
+    assert len(tasks) == 1
+
+
+def test_write_buffer_marshal(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, marshal=True, write_buffer=True)
+    task = tw.task_add("foobar")
+    task["priority"] = "L"
+    tw.task_update(task)
+    task["somenumber"] = 15
+    tw.task_update(task)
+    tw.flush()
+
+    _, stored = tw.get_task(uuid=task["uuid"])
+    assert stored["priority"] == "L"
+    assert stored["somenumber"] == 15
+
+
+def test_batch(tw: TaskWarrior):
+    existing = tw.task_add("existing")
+    to_delete = tw.task_add("to_delete")
+
+    with mock.patch.object(tw, "_execute", wraps=tw._execute) as execute:
+        with tw.batch():
+            added = tw.task_add("added", project="some_project")
+            done = tw.task_add("done")
+            added["priority"] = "H"
+            tw.task_update(added)
+            existing["tags"] = ["one"]
+            tw.task_update(existing)
+            tw.task_done(uuid=done["uuid"])
+            tw.task_delete(uuid=to_delete["uuid"])
+            assert not execute.called
+
+        commands = [call.args[0] for call in execute.call_args_list]
+        assert commands.count("import") == 1
+        assert commands.count("export") == 1  # the original of `existing`
+
+    _, stored = tw.get_task(uuid=added["uuid"])
+    assert stored["project"] == "some_project"
+    assert stored["priority"] == "H"
+    assert tw.get_task(uuid=existing["uuid"])[1]["tags"] == ["one"]
+    assert tw.get_task(uuid=done["uuid"])[1]["status"] == "completed"
+    assert tw.get_task(uuid=to_delete["uuid"])[1]["status"] == "deleted"
+
+
+def test_batch_discarded_on_error(tw: TaskWarrior):
+    with pytest.raises(RuntimeError):
+        with tw.batch():
+            tw.task_add("foobar")
+            raise RuntimeError()
+
+    assert len(tw.load_tasks()["pending"]) == 0
+
+
+def test_batch_rolled_back_on_failure(tw: TaskWarrior):
+    task = tw.task_add("foobar")
+    execute = tw._execute
+
+    def fail_on_delete(*args, **kw):
+        if "delete" in args:
+            raise TaskwarriorError(args, "", "", 1)
+        return execute(*args, **kw)
+
+    with pytest.raises(TaskwarriorError):
+        with mock.patch.object(tw, "_execute", side_effect=fail_on_delete):
+            with tw.batch():
+                tw.task_add("added")
+                task["priority"] = "H"
+                tw.task_update(task)
+                tw.task_done(uuid=task["uuid"])
+                tw.task_delete(uuid=task["uuid"])
+
+    tasks = tw.load_tasks()
+    assert [t["description"] for t in tasks["pending"]] == ["foobar"]
+    assert "priority" not in tasks["pending"][0]
+    assert len(tasks["completed"]) == 0
+
+
+def test_batch_rollback_failure_keeps_error(tw: TaskWarrior, caplog):
+    def fail(*args, **kw):
+        raise TaskwarriorError(args, "", "", 1)
+
+    with mock.patch.object(tw, "_import_tasks", side_effect=ValueError("import failed")):
+        with mock.patch.object(tw, "_undo_since", side_effect=fail):
+            with pytest.raises(ValueError, match="import failed"):
+                with tw.batch():
+                    tw.task_add("added")
+
+    assert "Cannot revert the failed batch" in caplog.text
+
+
+def test_batch_nested(tw: TaskWarrior):
+    with tw.batch():
+        tw.task_add("outer")
+        with tw.batch():
+            tw.task_add("inner")
+        assert len(tw.load_tasks()["pending"]) == 0
+
+    assert len(tw.load_tasks()["pending"]) == 2
+
+
+def test_write_queue(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, write_queue=True)
+    tasks = tw.task_add_many([{"description": "foobar %d" % i} for i in range(8)])
+
+    threads = [
+        threading.Thread(target=tw.task_done, kwargs={"uuid": task["uuid"]}) for task in tasks
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tw.load_tasks()["completed"]) == 8
+    stats = tw.write_queue_stats()
+    assert stats["depth"] == 0
+    assert stats["writes"] == 9
+    assert stats["commands"] <= 9
+
+
+def test_iter_tasks(tw: TaskWarrior):
+    tw.task_add_many(
+        [{"description": "foobar %d" % i, "project": "p%d" % (i % 2)} for i in range(5)]
+    )
+
+    tasks = tw.iter_tasks({"project": "p0"})
+    assert not isinstance(tasks, list)
+    assert sorted(task["description"] for task in tasks) == [
+        "foobar 0",
+        "foobar 2",
+        "foobar 4",
+    ]
+    assert len(list(tw.iter_tasks())) == 5
+
+
+def test_iter_tasks_marshal(tw_marshal: TaskWarrior):
+    added = tw_marshal.task_add("foobar", somenumber=15)
+
+    (task,) = tw_marshal.iter_tasks("status:pending")
+    assert task["uuid"] == added["uuid"]
+    assert task["somenumber"] == 15
+
+
+def test_iter_tasks_stop_early(tw: TaskWarrior, monkeypatch):
+    # Stands for an export that never ends.
+    script = "\n".join(
+        [
+            "import itertools, json, os",
+            "for i in itertools.count():",
+            "    print(json.dumps({'description': str(i), 'pid': os.getpid()}), flush=True)",
+        ]
+    )
+    monkeypatch.setattr(
+        tw,
+        "_get_command",
+        lambda args, overrides=None: ([sys.executable, "-c", script], os.environ),
+    )
+
+    tasks = tw.iter_tasks()
+    first = next(tasks)
+    assert first["description"] == "0"
+    tasks.close()
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(first["pid"], 0)
+
+
+def test_iter_tasks_stderr(tw: TaskWarrior, monkeypatch):
+    # More than a pipe holds, written before any task.
+    script = "\n".join(
+        [
+            "import sys",
+            "sys.stderr.write('warning\\n' * 100000)",
+            "sys.stderr.flush()",
+            'print(\'{"description": "foo"}\')',
+            "sys.exit(2)",
+        ]
+    )
+    monkeypatch.setattr(
+        tw,
+        "_get_command",
+        lambda args, overrides=None: ([sys.executable, "-c", script], os.environ),
+    )
+
+    tasks = tw.iter_tasks()
+    assert next(tasks)["description"] == "foo"
+    with pytest.raises(TaskwarriorError) as excinfo:
+        next(tasks)
+    assert excinfo.value.code == 2
+    assert excinfo.value.stderr.startswith(b"warning")
+
+
+def test_load_tasks_sharded(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, export_shards=8)
+    tasks = tw.task_add_many([{"description": "foobar %d" % i} for i in range(20)])
+    for task in tasks[:5]:
+        tw.task_done(uuid=task["uuid"])
+
+    with mock.patch.object(tw, "_get_task_objects", wraps=tw._get_task_objects) as export:
+        loaded = tw.load_tasks()
+        assert export.call_count == 8
+
+    assert sorted(t["uuid"] for t in loaded["pending"]) == sorted(t["uuid"] for t in tasks[5:])
+    assert sorted(t["uuid"] for t in loaded["completed"]) == sorted(
+        t["uuid"] for t in tasks[:5]
+    )
+
+
+def test_filter_tasks_sharded(tw: TaskWarrior):
+    tw.task_add_many(
+        [{"description": "foobar %d" % i, "project": "p%d" % (i % 2)} for i in range(20)]
+    )
+
+    tasks = tw.filter_tasks({"project": "p0"}, shards=4)
+    assert sorted(t["uuid"] for t in tasks) == sorted(
+        t["uuid"] for t in tw.filter_tasks({"project": "p0"})
+    )
+    assert len(tasks) == 10
+
+
+def test_load_tasks_single_export(tw: TaskWarrior):
+    done = tw.task_add("done")
+    tw.task_done(uuid=done["uuid"])
+    waiting = tw.task_add("waiting", wait="tomorrow")
+    pending = tw.task_add("pending")
+
+    with mock.patch.object(tw, "_execute", wraps=tw._execute) as execute:
+        tasks = tw.load_tasks()
+        assert execute.call_count == 1
+
+    assert sorted(t["uuid"] for t in tasks["pending"]) == sorted(
+        [pending["uuid"], waiting["uuid"]]
+    )
+    assert [t["uuid"] for t in tasks["completed"]] == [done["uuid"]]
+    assert [t["uuid"] for t in tw.load_tasks("completed")["completed"]] == [done["uuid"]]
+
+
+def test_load_tasks_and_filter_or(tw: TaskWarrior):
+    done = tw.task_add("done", tags=["b"])
+    tw.task_done(uuid=done["uuid"])
+    deleted = tw.task_add("deleted", tags=["b"])
+    tw.task_delete(uuid=deleted["uuid"])
+    a = tw.task_add("a", tags=["a"])
+    b = tw.task_add("b", tags=["b"])
+    tw.task_add("c")
+
+    tasks = tw.load_tasks_and_filter("pending", "+a or +b")
+    assert sorted(tasks) == ["pending"]
+    assert sorted(t["uuid"] for t in tasks["pending"]) == sorted([a["uuid"], b["uuid"]])
+
+
+def test_group_filter():
+    assert TaskWarrior._group_filter("") == ""
+    assert TaskWarrior._group_filter("  ") == ""
+    assert TaskWarrior._group_filter("+a or +b") == "( +a or +b )"
+
+
+def test_load_tasks_fields(tw: TaskWarrior):
+    done = tw.task_add("done", project="foo", annotations=["one"])
+    tw.task_done(uuid=done["uuid"])
+    tw.task_add("pending", project="bar", due="tomorrow")
+
+    tasks = tw.load_tasks(fields=["uuid", "project"])
+    assert set(tasks["pending"][0]) == {"uuid", "project", "status"}
+    assert tasks["pending"][0]["project"] == "bar"
+    assert set(tasks["completed"][0]) == {"uuid", "project", "status"}
+
+    (task,) = tw.filter_tasks({"project": "bar"}, fields=["description", "due"])
+    assert set(task) == {"description", "due"}
+
+
+def test_parse_task_objects_fields(tw_marshal: TaskWarrior):
+    export = b"""[
+{"uuid":"7a4d6c3a-7b8a-4b1e-9d3a-2f4f0a0b5c11","due":"20230102T030405Z","description":"a",
+ "annotations":[{"entry":"20230102T030405Z","description":"b"}]},
+{"uuid":"8c54c3b3-6e6e-4e84-b5c6-0d8a3d6a9e02","description":"c"}
+]"""
+    tasks = tw_marshal._parse_task_objects(export, fields=["uuid", "due"])
+
+    assert [set(task) for task in tasks] == [{"uuid", "due"}, {"uuid"}]
+    assert tasks[0]["due"].year == 2023
+    assert str(tasks[1]["uuid"]) == "8c54c3b3-6e6e-4e84-b5c6-0d8a3d6a9e02"
+
+
+def test_marshal_compact(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, marshal="compact")
+    tw.task_add("foobar", project="foo")
+
+    (record,) = tw.load_tasks()["pending"]
+    assert isinstance(record, TaskRecord)
+    assert record.project == "foo"
+
+    task = record.to_task()
+    task["project"] = "bar"
+    tw.task_update(task)
+    assert tw.filter_tasks({"project": "bar"})[0]["description"] == "foobar"
+
+
+def test_marshal_lazy(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, marshal="lazy")
+    tw.task_add("foobar", project="foo")
+
+    (task,) = tw.load_tasks()["pending"]
+    assert isinstance(task, LazyTask)
+    assert isinstance(task["entry"], datetime.datetime)
+
+    task["project"] = "bar"
+    tw.task_update(task)
+    assert tw.filter_tasks({"project": "bar"})[0]["description"] == "foobar"
+
+
+def test_load_table(tw: TaskWarrior):
+    tw.task_add("one", project="foo", tags=["a"])
+    tw.task_add("two", project="foo")
+    done = tw.task_add("three", project="bar")
+    tw.task_done(uuid=done["uuid"])
+
+    table = tw.load_table(fields=["status", "project", "tags"])
+    assert sorted(table.columns) == ["project", "status", "tags"]
+    assert table.count_by("status") == {"pending": 2, "completed": 1}
+    assert table.filter({"status": "pending"}).count_by("project") == {"foo": 2}
+    assert len(tw.load_table("+a")) == 1
+
+
+def test_command_prefix_is_cached(tw: TaskWarrior, monkeypatch):
+    command, env = tw._get_command(["export"])
+    assert command[-1] == b"export"
+    assert env["TASKRC"] == tw.config_filename
+
+    prefix = tw._get_command_prefix()
+    assert tw._get_command_prefix() is prefix
+    assert command[: len(prefix)] == prefix
+
+    monkeypatch.setenv("TASKDATA", "/somewhere/else")
+    assert tw._get_command(["export"])[1]["TASKDATA"] == "/somewhere/else"
+    assert tw._get_command_prefix() is prefix
+
+    # The executable is looked up in PATH.
+    monkeypatch.setenv("PATH", os.environ["PATH"] + os.pathsep + "/somewhere/else")
+    assert tw._get_command_prefix() is not prefix
+    prefix = tw._get_command_prefix()
+
+    tw.config_overrides["color"] = "off"
+    new_prefix = tw._get_command_prefix()
+    assert new_prefix is not prefix
+    assert b"rc.color=off" in new_prefix
+    assert b"rc.color=off" not in prefix
+
+
+def test_parse_json_falls_back_on_invalid_utf8(tw: TaskWarrior):
+    assert tw._parse_json('[{"description": "caf\u00e9"}]'.encode("utf-8")) == [
+        {"description": "caf\u00e9"}
+    ]
+    # Decoded the way kitchen does, rather than failing.
+    assert tw._parse_json(b'[{"description": "caf\xe9"}]') == [{"description": "caf\ufffd"}]
+
+
+def test_fast_spawn(empty_taskrc: str):
+    tw = TaskWarrior(config_filename=empty_taskrc, fast_spawn=True)
+    task = tw.task_add("foobar")
+    assert tw.get_task(uuid=task["uuid"])[1]["description"] == "foobar"
@@ -0,0 +1,45 @@
+import datetime
+from unittest import TestCase
+
+import dateutil.parser
+import pytz
+
+from taskw_ng.dates import UTC, format_date, parse_date
+
+
+class TestParseDate(TestCase):
+    def test_taskwarrior_format(self):
+        for value in ["20230102T030405Z", "19700101T000000Z", "20240229T235959Z"]:
+            self.assertEqual(parse_date(value), dateutil.parser.parse(value))
+            self.assertIs(parse_date(value).tzinfo, UTC)
+
+    def test_shares_repeated_dates(self):
+        self.assertIs(parse_date("20230102T030405Z"), parse_date("20230102T030405Z"))
+
+    def test_falls_back_to_dateutil(self):
+        self.assertEqual(
+            parse_date("2023-01-02T03:04:05+01:00"),
+            datetime.datetime(2023, 1, 2, 2, 4, 5, tzinfo=UTC),
+        )
+        self.assertEqual(parse_date("2023-01-02"), datetime.datetime(2023, 1, 2, tzinfo=UTC))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_date("20230230T030405Z")
+
+
+class TestFormatDate(TestCase):
+    def test_aware(self):
+        value = pytz.timezone("America/Los_Angeles").localize(
+            datetime.datetime(2023, 1, 2, 3, 4, 5)
+        )
+        self.assertEqual(format_date(value), "20230102T110405Z")
+
+    def test_naive(self):
+        value = datetime.datetime(2023, 1, 2, 3, 4, 5)
+        self.assertEqual(
+            format_date(value), value.astimezone(pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+        )
+
+    def test_roundtrip(self):
+        self.assertEqual(format_date(parse_date("20230102T030405Z")), "20230102T030405Z")
@@ -1,12 +1,15 @@
 import datetime
+import sys
 import uuid
-from unittest import TestCase
+from unittest import TestCase, skipIf
 
 from dateutil.tz import tzlocal
 from pytz import UTC, timezone
 
 from taskw_ng import fields
 from taskw_ng.fields.annotationarray import Annotation
+from taskw_ng.fields.base import DirtyableDict
+from taskw_ng.utils import parse_version
 
 
 class TestAnnotationArrayField(TestCase):
@@ -204,6 +207,16 @@ class TestCommaSeparatedUUIDField(TestCase):
 
         self.assertEqual(actual_value, expected_value)
 
+    def test_version(self):
+        self.assertEqual(self.field.version, parse_version("2.4"))
+        self.assertIs(self.field.version, fields.CommaSeparatedUUIDField.version)
+
+    def test_serialize_list_from_version_2_5(self):
+        self.field.version = parse_version("2.5")
+        single_uuid = [uuid.uuid4()]
+
+        self.assertEqual(self.field.serialize(single_uuid), [str(single_uuid[0])])
+
 
 class TestDateField(TestCase):
     def setUp(self):
@@ -422,3 +435,22 @@ class TestUUIDField(TestCase):
         expected_result = arbitrary_uuid
 
         self.assertEqual(actual_result, expected_result)
+
+
+class TestDirtyableDict(TestCase):
+    def test_tracks_mutations(self):
+        dirty_keys = set()
+        value = DirtyableDict({"a": 1})
+        value.track(dirty_keys, "uda")
+        self.assertEqual(value.get_changes(), {})
+
+        value.update(b=2)
+        self.assertEqual(dirty_keys, {"uda"})
+        self.assertEqual(value.get_changes(), ({"a": 1}, {"a": 1, "b": 2}))
+
+    @skipIf(sys.version_info < (3, 9), "dict supports |= from Python 3.9 on")
+    def test_tracks_in_place_union(self):
+        value = DirtyableDict({"a": 1})
+        value |= {"b": 2}
+        self.assertIsInstance(value, DirtyableDict)
+        self.assertEqual(value.get_changes(), ({"a": 1}, {"a": 1, "b": 2}))
@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from taskw_ng.warrior import TaskWarrior
+
+HEAVY_MODULES = ["asyncio", "concurrent.futures", "dateutil", "kitchen", "packaging", "pytz"]
+
+
+def test_import_is_cheap():
+    """Importing the package neither runs taskwarrior nor loads heavy dependencies."""
+    code = "import sys, taskw_ng; print([m for m in %r if m in sys.modules])" % HEAVY_MODULES
+    env = dict(os.environ, PATH="")  # taskwarrior can't be found
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+
+    output = subprocess.check_output([sys.executable, "-c", code], env=env)
+    assert output.strip() == b"[]"
+
+
+@pytest.fixture
+def fake_task(tmpdir, monkeypatch):
+    """A `task` binary counting how many times it is asked for its version."""
+    calls = tmpdir.join("calls")
+    executable = tmpdir.mkdir("bin").join("task")
+    executable.write("#!/bin/sh\necho x >> %s\necho 2.6.2\n" % calls)
+    executable.chmod(0o755)
+
+    monkeypatch.setenv("PATH", str(executable.dirpath()))
+    monkeypatch.setattr(TaskWarrior, "taskwarrior_version", None, raising=False)
+    monkeypatch.setattr(
+        TaskWarrior, "VERSION_CACHE_FILENAME", str(tmpdir.join("versions.json"))
+    )
+    return executable, calls
+
+
+def test_version_is_cached_on_disk(fake_task, monkeypatch):
+    executable, calls = fake_task
+
+    assert str(TaskWarrior.get_version()) == "2.6.2"
+    assert len(calls.readlines()) == 1
+
+    # Another process would find it in the cache
+    monkeypatch.setattr(TaskWarrior, "taskwarrior_version", None, raising=False)
+    assert str(TaskWarrior.get_version()) == "2.6.2"
+    assert len(calls.readlines()) == 1
+
+    with open(TaskWarrior.VERSION_CACHE_FILENAME) as f:
+        assert json.load(f)[str(executable)]["version"] == "2.6.2"
+
+
+def test_version_cache_invalidated_by_new_binary(fake_task, monkeypatch):
+    executable, calls = fake_task
+    TaskWarrior.get_version()
+
+    stat = os.stat(str(executable))
+    os.utime(str(executable), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    monkeypatch.setattr(TaskWarrior, "taskwarrior_version", None, raising=False)
+    TaskWarrior.get_version()
+    assert len(calls.readlines()) == 2
@@ -0,0 +1,62 @@
+import datetime
+import pickle
+import uuid
+from unittest import TestCase
+
+from taskw_ng.fields import NumericField
+from taskw_ng.record import TaskRecord
+from taskw_ng.task import Task
+
+TASK = {
+    "uuid": "d4b54c6d-b6a2-4173-8313-79086ef2af18",
+    "description": "Something important",
+    "status": "pending",
+    "due": "20230102T030405Z",
+    "tags": ["one", "two"],
+    "annotations": [{"entry": "20230102T030405Z", "description": "awesome"}],
+    "estimate": "3",
+    "unknown": "value",
+}
+UDAS = {"estimate": NumericField(label="Estimate")}
+
+
+class TestTaskRecord(TestCase):
+    def setUp(self):
+        self.record = TaskRecord(TASK, udas=UDAS)
+
+    def test_marshals_like_task(self):
+        self.assertEqual(self.record["uuid"], uuid.UUID(TASK["uuid"]))
+        self.assertIsInstance(self.record.due, datetime.datetime)
+        self.assertEqual(self.record["estimate"], 3)
+        self.assertEqual(self.record["unknown"], "value")
+        self.assertEqual(self.record["tags"], ("one", "two"))
+
+    def test_missing_keys(self):
+        self.assertNotIn("wait", self.record)
+        self.assertIsNone(self.record.get("wait"))
+        with self.assertRaises(KeyError):
+            self.record["other"]
+        self.assertEqual(len(self.record), len(TASK))
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.record.description = "Other"
+        with self.assertRaises(TypeError):
+            self.record["description"] = "Other"
+        self.assertFalse(hasattr(self.record, "__dict__"))
+
+    def test_to_task(self):
+        task = self.record.to_task()
+
+        self.assertIsInstance(task, Task)
+        self.assertEqual(task, Task(TASK, udas=UDAS))
+        self.assertEqual(task.get_changes(), {})
+
+        task["tags"].append("three")
+        task["description"] = "Other"
+        self.assertEqual(set(task.get_changes()), {"tags", "description"})
+        self.assertEqual(self.record["tags"], ("one", "two"))
+        self.assertEqual(task.serialized()["estimate"], 3)
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.record)), self.record)
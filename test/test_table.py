@@ -0,0 +1,143 @@
+import datetime
+import math
+
+import pytest
+
+from taskw_ng.fields import NumericField
+from taskw_ng.table import MISSING_DATE, TaskTable
+
+TASKS = [
+    {
+        "uuid": "d4b54c6d-b6a2-4173-8313-79086ef2af18",
+        "description": "one",
+        "status": "pending",
+        "project": "home",
+        "due": "20230102T030405Z",
+        "tags": ["a", "b"],
+        "urgency": 4.5,
+        "estimate": 2,
+    },
+    {
+        "uuid": "8c54c3b3-6e6e-4e84-b5c6-0d8a3d6a9e02",
+        "description": "two &open;x&close;",
+        "status": "completed",
+        "project": "work",
+        "due": "20230101T000000Z",
+        "urgency": 1.0,
+    },
+    {
+        "uuid": "7a4d6c3a-7b8a-4b1e-9d3a-2f4f0a0b5c11",
+        "description": "three",
+        "status": "pending",
+        "project": "work.meetings",
+        "tags": ["b"],
+        "urgency": 9.0,
+    },
+    {
+        "uuid": "0e0b2c6e-8a4b-4d2c-8d5e-63a3f1e0b7a4",
+        "description": "four",
+        "status": "pending",
+        "due": "20240101T000000Z",
+        "urgency": 0.0,
+    },
+]
+UDAS = {"estimate": NumericField(label="Estimate")}
+
+
+@pytest.fixture(params=[False, True], ids=["array", "numpy"])
+def table(request):
+    if request.param:
+        pytest.importorskip("numpy")
+    return TaskTable.from_export(TASKS, udas=UDAS, use_numpy=request.param)
+
+
+def descriptions(table):
+    return table.values("description")
+
+
+def test_columns(table):
+    assert len(table) == 4
+    assert "annotations" not in table.columns
+    assert table.values("project") == ["home", "work", "work.meetings", None]
+    assert table.values("description")[1] == "two [x]"
+    assert table.values("due")[0] == datetime.datetime(
+        2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+    )
+    assert table.column("due")[2] == MISSING_DATE
+    assert table.values("estimate") == [2.0, None, None, None]
+    assert math.isnan(table.column("estimate")[1])
+    assert table.values("tags") == [["a", "b"], [], ["b"], []]
+
+
+def test_filter(table):
+    assert descriptions(table.filter({"status": "pending", "project.startswith": "work"})) == [
+        "three"
+    ]
+    assert descriptions(table.filter({"project.isnt": "home"})) == [
+        "two [x]",
+        "three",
+        "four",
+    ]
+    assert descriptions(table.filter({"project.none": ""})) == ["four"]
+    assert descriptions(table.filter({"due.before": datetime.date(2023, 6, 1)})) == [
+        "one",
+        "two [x]",
+    ]
+    assert descriptions(table.filter({"due.after": "20230101T000000Z"})) == ["one", "four"]
+    assert descriptions(table.filter({"urgency.above": 2, "tags.has": "b"})) == [
+        "one",
+        "three",
+    ]
+    assert descriptions(table.filter({"tags.hasnt": "a"})) == ["two [x]", "three", "four"]
+    assert descriptions(table.filter({"tags": "c"})) == []
+    assert len(table.filter({})) == 4
+
+    with pytest.raises(KeyError):
+        table.filter({"nope": 1})
+    with pytest.raises(ValueError):
+        table.filter({"tags.before": 1})
+
+
+def test_sort_by(table):
+    assert descriptions(table.sort_by("urgency")) == ["four", "two [x]", "one", "three"]
+    assert descriptions(table.sort_by("due")) == ["two [x]", "one", "four", "three"]
+    assert descriptions(table.sort_by("due", reverse=True)) == [
+        "four",
+        "one",
+        "two [x]",
+        "three",
+    ]
+    assert descriptions(table.sort_by("project", reverse=True)) == [
+        "three",
+        "two [x]",
+        "one",
+        "four",
+    ]
+
+
+def test_count_by(table):
+    assert table.count_by("status") == {"pending": 3, "completed": 1}
+    assert table.count_by("project") == {"home": 1, "work": 1, "work.meetings": 1, None: 1}
+    assert table.count_by("tags") == {"a": 1, "b": 2, None: 2}
+    assert table.count_by("estimate") == {2.0: 1, None: 3}
+
+
+def test_group_by(table):
+    groups = table.group_by("status")
+    assert sorted(groups) == ["completed", "pending"]
+    assert descriptions(groups["pending"]) == ["one", "three", "four"]
+    assert groups["pending"].values("urgency") == [4.5, 9.0, 0.0]
+
+    groups = table.group_by("tags")
+    assert descriptions(groups["b"]) == ["one", "three"]
+    assert descriptions(groups[None]) == ["two [x]", "four"]
+
+
+def test_many_tags():
+    tasks = [{"tags": ["tag%d" % i, "common"]} for i in range(100)]
+    table = TaskTable.from_export(tasks, use_numpy=False)
+
+    assert len(table.column("tags")) == 2
+    assert table.values("tags")[99] == ["common", "tag99"]
+    assert table.count_by("tags")["common"] == 100
+    assert len(table.filter({"tags": ["tag80", "common"]})) == 1
@@ -7,7 +7,8 @@ from unittest import TestCase
 import pytz
 from dateutil.tz import tzutc
 
-from taskw_ng.task import Task
+from taskw_ng.fields import ChoiceField, NumericField
+from taskw_ng.task import LazyTask, Task
 
 
 class TestTaskDirtyability(TestCase):
@@ -71,6 +72,43 @@ class TestTaskDirtyability(TestCase):
 
         self.assertEqual(actual_changes, expected_changes)
 
+    def test_does_not_mark_reverted_tags(self):
+        self.task["tags"].append("alpha")
+        self.task["tags"].remove("alpha")
+
+        self.assertEqual(self.task.get_changes(), {})
+
+    def test_resets_changes(self):
+        self.task["tags"].append("alpha")
+        self.task["project"] = "Home"
+        self.assertEqual(set(self.task.get_changes(keep=True)), {"tags", "project"})
+        self.assertEqual(set(self.task.get_changes()), {"tags", "project"})
+        self.assertEqual(self.task.get_changes(), {})
+
+        self.task["tags"].pop()
+        self.assertEqual(
+            self.task.get_changes(),
+            {"tags": [["one", "two", "three", "alpha"], ["one", "two", "three"]]},
+        )
+
+    def test_serialized_changes(self):
+        self.task["project"] = "Home"
+        self.task["project"] = "Work"
+        self.task["tags"] += ["alpha"]
+
+        self.assertEqual(
+            self.task.serialized_changes(),
+            {"project": "Work", "tags": ["one", "two", "three", "alpha"]},
+        )
+
+    def test_copied_tags_are_unchanged(self):
+        self.task["tags"].append("alpha")
+        copied = copy.deepcopy(self.task["tags"])
+        self.task.get_changes()
+
+        self.assertEqual(copied.get_changes(), (["one", "two", "three"], copied))
+        self.assertEqual(copy.deepcopy(self.task["tags"]).get_changes(), {})
+
     def test_does_not_mark_unchanged(self):
         self.task["description"] = self.task["description"]
 
@@ -211,3 +249,151 @@ class TestTaskMarshalling(TestCase):
             2018, 10, 12, 11, 6, 5, tzinfo=tzutc()
         )
         assert on_modify_task.get("uuid") == uuid.UUID("daa3ff05-f716-482e-bc35-3e1601e50778")
+
+
+class TestBulkFromExport(TestCase):
+    def setUp(self):
+        self.udas = {"estimate": NumericField()}
+        self.data = [
+            {
+                "uuid": "d4b54c6d-b6a2-4173-8313-79086ef2af18",
+                "description": "one &open;x&close;",
+                "entry": "20230102T030405Z",
+                "tags": ["a", "b"],
+                "estimate": "3",
+                "unknown": "value",
+            },
+            {"description": "two", "priority": "H", "estimate": 1.5},
+            {},
+        ]
+
+    def test_same_as_task(self):
+        tasks = Task.bulk_from_export(self.data, udas=self.udas)
+
+        self.assertEqual(tasks, [Task(data, udas=self.udas) for data in self.data])
+        self.assertEqual(list(tasks[0]), list(self.data[0]))
+        self.assertEqual(tasks[0]["description"], "one [x]")
+        self.assertEqual(tasks[0]["estimate"], 3)
+
+    def test_tracks_changes(self):
+        tasks = Task.bulk_from_export(self.data, udas=self.udas)
+        tasks[0]["tags"].append("c")
+        tasks[1]["project"] = "Home"
+
+        self.assertEqual(tasks[0].get_changes(), {"tags": [["a", "b"], ["a", "b", "c"]]})
+        self.assertEqual(tasks[1].get_changes(), {"project": [None, "Home"]})
+
+    def test_from_stub_keeps_values(self):
+        due = datetime.datetime(2023, 1, 2, 3, 4, 5)
+        task = Task.from_stub({"description": "Test", "due": due, "tags": ["a"]})
+
+        self.assertIs(task["due"], due)
+        task["tags"].append("b")
+        self.assertEqual(task.get_changes(), {"tags": [["a"], ["a", "b"]]})
+
+    def test_from_stub_deserializes_strings(self):
+        task = Task.from_stub(
+            {
+                "description": "Test",
+                "uuid": "d4b54c6d-b6a2-4173-8313-79086ef2af18",
+                "due": "20240101T000000Z",
+                "priority": "h",
+            }
+        )
+
+        self.assertEqual(task["uuid"], uuid.UUID("d4b54c6d-b6a2-4173-8313-79086ef2af18"))
+        self.assertEqual(
+            task["due"], datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        )
+        self.assertEqual(task["priority"], "h")
+        self.assertEqual(task.get_changes(), {})
+
+    def test_from_stub_validates(self):
+        with self.assertRaises(ValueError):
+            Task.from_stub({"description": "Test", "priority": "Z"})
+        with self.assertRaises(ValueError):
+            Task.from_stub({"description": "Test", "uuid": "not-a-uuid"})
+
+    def test_from_stub_validates_udas(self):
+        udas = {"size": ChoiceField(choices=["S", "M", "L"])}
+
+        self.assertEqual(Task.from_stub({"size": "M"}, udas=udas)["size"], "M")
+        with self.assertRaises(ValueError):
+            Task.from_stub({"description": "Test", "size": "XL"}, udas=udas)
+
+
+class TestTaskSchema(TestCase):
+    def test_shared(self):
+        schema = Task.get_schema({"estimate": NumericField()})
+        task = Task({"description": "Test", "estimate": "3"}, udas=schema)
+        stub = Task.from_stub({"description": "Test", "estimate": 3}, udas=schema)
+
+        self.assertIs(task._fields, schema)
+        self.assertIs(stub._fields, schema)
+        self.assertEqual(task["estimate"], 3)
+        self.assertIs(Task({})._fields, Task({})._fields)
+
+    def test_shared_by_uda_dicts(self):
+        udas = {"estimate": NumericField()}
+        schema = Task.get_schema(udas)
+
+        self.assertIs(Task.get_schema(dict(udas)), schema)
+        self.assertIs(Task({}, udas=dict(udas))._fields.codec, schema.codec)
+        self.assertIsNot(Task.get_schema({"estimate": NumericField()}), schema)
+
+    def test_immutable(self):
+        schema = Task.get_schema()
+        with self.assertRaises(TypeError):
+            schema["estimate"] = NumericField()
+        with self.assertRaises(TypeError):
+            schema.update({"estimate": NumericField()})
+        self.assertNotIn("estimate", Task.FIELDS)
+
+
+class TestLazyTask(TestCase):
+    def setUp(self):
+        self.data = {
+            "uuid": "daa3ff05-f716-482e-bc35-3e1601e50778",
+            "description": "Go to Camelot",
+            "entry": "20180618T030242Z",
+            "tags": ["one", "two"],
+        }
+        self.task = LazyTask(self.data)
+
+    def test_deserializes_on_access(self):
+        self.assertEqual(dict.__getitem__(self.task, "entry"), "20180618T030242Z")
+        self.assertEqual(
+            self.task["entry"], datetime.datetime(2018, 6, 18, 3, 2, 42, tzinfo=tzutc())
+        )
+        self.assertEqual(
+            dict.__getitem__(self.task, "entry"),
+            datetime.datetime(2018, 6, 18, 3, 2, 42, tzinfo=tzutc()),
+        )
+        self.assertEqual(self.task.get("uuid"), uuid.UUID(self.data["uuid"]))
+
+    def test_same_as_task(self):
+        self.assertEqual(self.task, Task(self.data))
+        self.assertEqual(LazyTask(self.data), self.task)
+        self.assertEqual(dict(LazyTask(self.data)), dict(Task(self.data)))
+        self.assertEqual(LazyTask(self.data).pop("uuid"), uuid.UUID(self.data["uuid"]))
+
+    def test_serialized_passes_raw_values_through(self):
+        self.task["description"] = "Go to Camelot again"
+        serialized = self.task.serialized()
+
+        self.assertEqual(serialized, dict(self.data, description="Go to Camelot again"))
+        self.assertIs(serialized["tags"], self.data["tags"])
+        self.assertEqual(dict.__getitem__(self.task, "tags"), ["one", "two"])
+
+    def test_tracks_changes(self):
+        self.assertEqual(self.task.get_changes(), {})
+        self.task["tags"].append("three")
+        self.task["project"] = "Home"
+
+        changes = self.task.get_changes()
+        self.assertEqual(set(changes), {"tags", "project"})
+        self.assertEqual(changes["tags"][1], ["one", "two", "three"])
+
+    def test_copy(self):
+        copied = copy.deepcopy(self.task)
+        self.assertEqual(copied, Task(self.data))
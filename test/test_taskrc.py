@@ -2,6 +2,7 @@ import os
 from unittest import TestCase
 
 from taskw_ng.fields import ChoiceField, NumericField
+from taskw_ng.task import Task
 from taskw_ng.taskrc import TaskRc
 from taskw_ng.warrior import TaskWarrior
 
@@ -94,6 +95,16 @@ class TestTaskRc(TestCase):
 
         self.assertEqual(actual_udas, expected_udas)
 
+    def test_get_schema(self):
+        schema = self.taskrc.get_schema()
+
+        self.assertIs(self.taskrc.get_schema(), schema)
+        self.assertIs(Task.get_schema(self.taskrc.get_udas()), schema)
+        self.assertEqual(schema["a"], NumericField(label="Alpha"))
+        self.assertIs(schema["due"], Task.FIELDS["due"])
+        with self.assertRaises(TypeError):
+            schema["c"] = NumericField()
+
     def test_config_overrides(self):
         overrides = {
             "uda": {
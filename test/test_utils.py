@@ -6,11 +6,16 @@ import pytz
 
 from taskw_ng.utils import (
     DATE_FORMAT,
+    chunk_args,
     clean_ctrl_chars,
+    clean_output,
     convert_dict_to_override_args,
     decode_task,
+    diff_task_fields,
+    encode_annotations_json,
     encode_task,
     encode_task_experimental,
+    encode_task_json,
 )
 
 TASK = {
@@ -170,6 +175,67 @@ class TestUtils(object):
 
         assert set(actual_overrides) == set(expected_overrides)
 
+    def test_encode_task_json(self):
+        task = {
+            "description": "foo\x00bar [baz]",
+            "due": datetime.datetime(2011, 1, 1, tzinfo=pytz.utc),
+            "priority": None,
+            "project": "",
+            "tags": ["one", "two"],
+            "urgency": 1.5,
+        }
+
+        assert encode_task_json(task) == {
+            "description": "foobar [baz]",
+            "due": "20110101T000000Z",
+            "tags": ["one", "two"],
+        }
+
+    def test_encode_task_json_set_of_tags(self):
+        task = {"description": "foo", "tags": {"two", "one"}}
+        assert encode_task_json(task) == {"description": "foo", "tags": ["one", "two"]}
+        task["tags"] = frozenset(task["tags"])
+        assert encode_task_json(task) == {"description": "foo", "tags": ["one", "two"]}
+
+    def test_encode_annotations_json_keeps_existing_entries(self):
+        original = [{"entry": "20110101T000000Z", "description": "first"}]
+        now = datetime.datetime(2011, 1, 1, tzinfo=pytz.utc)
+
+        encoded = encode_annotations_json(["first", "second"], original=original, now=now)
+
+        assert encoded == [
+            {"entry": "20110101T000000Z", "description": "first"},
+            {"entry": "20110101T000001Z", "description": "second"},
+        ]
+
+    def test_diff_task_fields(self):
+        original = {
+            "description": "foobar",
+            "due": "20110101T000000Z",
+            "tags": ["one", "two"],
+            "somenumber": 15,
+        }
+        task = {
+            "description": "foobar",
+            "due": datetime.datetime(2011, 1, 1, tzinfo=pytz.utc),
+            "tags": ["one", "three"],
+            "somenumber": None,
+            "somestring": None,
+        }
+
+        assert diff_task_fields(original, task) == {
+            "tags": ["one", "three"],
+            "somenumber": None,
+        }
+
+    def test_chunk_args(self):
+        args = ["c1c431ea-f0dc-4683-9a20-e64fcfa65fd1"] * 10
+
+        chunks = list(chunk_args(args, max_length=200))
+
+        assert sum(chunks, []) == args
+        assert all(len(chunk) == 4 for chunk in chunks[:-1])
+
 
 class TestCleanExecArg(object):
     def test_clean_null(self):
@@ -180,3 +246,12 @@ class TestCleanExecArg(object):
         # input = bytes(range(0x20))
         input = b"\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f"  # For python 2 compatibility
         assert b"\t\n\v\f\r" == clean_ctrl_chars(input)
+
+
+class TestCleanOutput(object):
+    def test_terminal_escapes(self):
+        assert b"?[1mbold?[0m ? ? ?" == clean_output(b"\x1b[1mbold\x1b[0m \a \b \f")
+
+    def test_keeps_utf8(self):
+        output = "\u00e9\u2603 \U0001f600\n\t".encode("utf-8")
+        assert output == clean_output(output)
@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from taskw_ng.writer import WriteQueue, get_write_queue
+
+UUID1 = "c1c431ea-f0dc-4683-9a20-e64fcfa65fd1"
+UUID2 = "4882751a-3966-4439-9675-948b1152895c"
+UUID3 = "7a4d6c3a-7b8a-4b1e-9d3a-2f4f0a0b5c11"
+
+
+class Client(object):
+    """Records the commands it is asked to run, blocking until `release` is set.
+
+    Commands involving UUID3 fail.
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.running = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def _get_max_args_length(self):
+        return 4096
+
+    def _run(self, *args, stdin=None):
+        self.commands.append((list(args), stdin))
+        self.running.set()
+        self.release.wait()
+        if UUID3 in args:
+            raise ValueError("No such task")
+        return " ".join(args), ""
+
+
+@pytest.fixture
+def client() -> Client:
+    return Client()
+
+
+def submit_in_thread(queue, client, args, stdin=None):
+    """Submit a write from another thread, waiting for it to be queued."""
+    depth = queue.depth
+    thread = threading.Thread(
+        target=queue.submit, args=(client, args), kwargs={"stdin": stdin}
+    )
+    thread.start()
+    while queue.depth == depth:
+        time.sleep(0.001)
+    return thread
+
+
+def block_queue(queue, client):
+    """Submit a write from another thread, keeping it running until `client.release`."""
+    client.release.clear()
+    thread = threading.Thread(target=queue.submit, args=(client, ["add", "foo"]))
+    thread.start()
+    client.running.wait()
+    return thread
+
+
+def test_submit(client: Client):
+    queue = WriteQueue()
+
+    assert queue.submit(client, [UUID1, "modify", "foo"]) == (UUID1 + " modify foo", "")
+    assert client.commands == [([UUID1, "modify", "foo"], None)]
+    stats = queue.stats()
+    assert stats["depth"] == 0
+    assert stats["writes"] == 1
+    assert stats["commands"] == 1
+
+
+def test_merges_queued_writes(client: Client):
+    queue = WriteQueue()
+    first = block_queue(queue, client)
+
+    threads = [
+        submit_in_thread(queue, client, [UUID1, "done"]),
+        submit_in_thread(queue, client, ["import"], stdin='{"a": 1}'),
+        submit_in_thread(queue, client, [UUID2, "delete"]),
+        submit_in_thread(queue, client, [UUID2, "done"]),
+        submit_in_thread(queue, client, ["import"], stdin='{"b": 2}'),
+        submit_in_thread(queue, client, [UUID1, "modify", "foo"]),
+    ]
+    assert queue.stats()["depth"] == 6
+
+    client.release.set()
+    for thread in [first] + threads:
+        thread.join()
+
+    assert client.commands == [
+        (["add", "foo"], None),
+        ([UUID1, UUID2, "done"], None),
+        (["import"], '{"a": 1}\n{"b": 2}'),
+        ([UUID2, "delete"], None),
+        ([UUID1, "modify", "foo"], None),
+    ]
+    stats = queue.stats()
+    assert stats["writes"] == 7
+    assert stats["commands"] == 5
+    assert stats["max_wait"] > 0
+    assert stats["total_wait"] >= stats["max_wait"]
+
+
+def test_merged_writes_fail_separately(client: Client):
+    queue = WriteQueue()
+    first = block_queue(queue, client)
+
+    errors = []
+
+    def submit(args):
+        try:
+            queue.submit(client, args)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=submit, args=([UUID1, "done"],)),
+        threading.Thread(target=submit, args=([UUID3, "done"],)),
+    ]
+    for thread in threads:
+        thread.start()
+    while queue.depth < 2:
+        time.sleep(0.001)
+    client.release.set()
+    for thread in [first] + threads:
+        thread.join()
+
+    assert len(errors) == 1
+    assert client.commands[1:] == [
+        ([UUID1, UUID3, "done"], None),
+        ([UUID1, "done"], None),
+        ([UUID3, "done"], None),
+    ]
+    assert queue.stats()["commands"] == 4
+
+
+def test_get_write_queue(tmpdir):
+    queue = get_write_queue(str(tmpdir))
+    assert get_write_queue(str(tmpdir) + "/") is queue
+    assert get_write_queue(str(tmpdir.mkdir("other"))) is not queue